@@ -3,7 +3,7 @@ from django.contrib.auth.admin import UserAdmin
 
 from .models import (
     User, Subscriber, Tag, Ingredient, Recipe,
-    Amount, ShoppingCart, RecipeTag, Favorite
+    Amount, ShoppingCart, RecipeTag, Favorite, ShoppingListItem
 )
 
 
@@ -56,7 +56,7 @@ class RecipeAdmin(admin.ModelAdmin):
     search_fields = ('author', 'name')
 
     def counter(self, obj):
-        return obj.favoritess.count()
+        return obj.favorites_count
 
     counter.short_description = 'Счетчик добавления в избранное'
 
@@ -90,3 +90,11 @@ class FavoriteAdmin(admin.ModelAdmin):
                     'recipes',
                     'user')
     empty_value_display = '-пусто-'
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = ('user',
+                    'ingredient',
+                    'total')
+    search_fields = ('user__username',)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiFoodgamConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api_foodgram'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,54 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+# Маршруты самых нагруженных запросов на чтение.
+ASYNC_VIEW_NAMES = {
+    'recipes-list', 'recipes-detail',
+    'tags-list', 'tags-detail',
+    'ingredients-list', 'ingredients-detail',
+    'user-subscriptions',
+}
+
+
+def run_view(view, request, *args, **kwargs):
+    """Выполняет view в потоке пула и освобождает его соединение с БД."""
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """
+    Асинхронная обертка над синхронной view для запуска под ASGI.
+
+    В Django 3.2 нет асинхронного ORM, поэтому сама view остается
+    синхронной и выполняется в общем пуле потоков, а цикл событий
+    сервера тем временем обслуживает другие запросы: медленные
+    клиенты и ожидание БД не занимают весь воркер.
+    """
+    run = sync_to_async(run_view, thread_sensitive=False)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run(view, request, *args, **kwargs)
+
+    return wrapper
+
+
+def get_async_urls(urls, names=ASYNC_VIEW_NAMES):
+    """Маршруты urls, в которых view из names заменены асинхронными."""
+    return [
+        URLPattern(
+            url.pattern, async_view(url.callback),
+            url.default_args, url.name
+        ) if isinstance(url, URLPattern) and url.name in names else url
+        for url in urls
+    ]
@@ -0,0 +1,71 @@
+import copy
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import TTLCache
+from .versions import AUTH_VERSION, get_version
+
+TOKEN_CACHE_KEY = 'foodgram:token:{}'
+
+token_cache = TTLCache(
+    settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_TTL
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, который запоминает токен и пользователя
+    в кэше воркера на TOKEN_CACHE_TTL секунд, а при TOKEN_CACHE_SHARED
+    еще и в общем кэше Django.
+
+    Запись действительна, пока не сменилась версия AUTH_VERSION
+    пользователя: ее сбрасывают удаление токена (выход), смена пароля,
+    деактивация и другие сохранения пользователя. Неверные токены и
+    неактивные пользователи не кэшируются и отклоняются с теми же
+    ошибками 401, что и в TokenAuthentication.
+    """
+
+    def get_cached(self, cache_key):
+        entry = token_cache.get(cache_key)
+        if entry is None and settings.TOKEN_CACHE_SHARED:
+            entry = cache.get(TOKEN_CACHE_KEY.format(cache_key))
+            if entry is not None:
+                token_cache.set(cache_key, entry)
+        if entry is None:
+            return None
+        user, token, version = entry
+        if version != get_version(AUTH_VERSION.format(user.pk)):
+            token_cache.delete(cache_key)
+            return None
+        return user, token
+
+    def authenticate_credentials(self, key):
+        cache_key = sha256(key.encode()).hexdigest()
+        cached = self.get_cached(cache_key)
+        if cached is not None:
+            user, token = cached
+            # Копия, чтобы изменения request.user в одном запросе
+            # не попадали в кэш.
+            return copy.copy(user), token
+        # Версия читается до загрузки пользователя: выход, смена пароля
+        # или деактивация, зафиксированные во время загрузки, сменят
+        # ее позже, и запись не пройдет проверку. Владелец токена
+        # не меняется, поэтому его id можно прочитать заранее.
+        user_id = self.get_model().objects.filter(key=key).values_list(
+            'user_id', flat=True
+        ).first()
+        version = get_version(AUTH_VERSION.format(user_id))
+        user, token = super().authenticate_credentials(key)
+        if user.pk != user_id:
+            return user, token
+        entry = (copy.copy(user), token, version)
+        token_cache.set(cache_key, entry)
+        if settings.TOKEN_CACHE_SHARED:
+            cache.set(
+                TOKEN_CACHE_KEY.format(cache_key), entry,
+                settings.TOKEN_CACHE_TTL
+            )
+        return user, token
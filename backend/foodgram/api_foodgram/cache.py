@@ -0,0 +1,125 @@
+import gzip
+from collections import OrderedDict
+from io import BytesIO
+from hashlib import sha1
+from threading import Lock
+from time import monotonic
+
+GZIP_MIN_LENGTH = 1024
+
+
+def compress(body):
+    """
+    gzip без времени в заголовке: одно и то же тело дает одни и те же
+    байты в каждом воркере. gzip.compress(mtime=...) - только с 3.8.
+    """
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as file:
+        file.write(body)
+    return buffer.getvalue()
+
+
+class RenderedEntry:
+    """Готовое тело ответа, его gzip-версия и ETag."""
+
+    def __init__(self, version, body):
+        self.version = version
+        self.body = body
+        self.etag = f'"{sha1(body).hexdigest()}"'
+        self.gzip_body = None
+        self.gzip_etag = None
+        if len(body) >= GZIP_MIN_LENGTH:
+            self.gzip_body = compress(body)
+            self.gzip_etag = f'"{sha1(body).hexdigest()}-gzip"'
+
+
+class RenderedCache:
+    """Кэш воркера с готовыми телами ответов, привязанными к версии."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+        return None
+
+    def set(self, key, version, body):
+        entry = RenderedEntry(version, body)
+        self.entries[key] = entry
+        return entry
+
+
+rendered_cache = RenderedCache()
+
+
+class LRUCache:
+    """
+    Ограниченный по числу записей LRU-кэш воркера со счетчиками
+    попаданий, промахов и вытеснений.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, keys):
+        found = {}
+        with self.lock:
+            for key in keys:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    found[key] = self.entries[key]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        return {
+            'max_entries': self.max_entries,
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class TTLCache(LRUCache):
+    """LRU-кэш воркера, записи которого живут не дольше ttl секунд."""
+
+    def __init__(self, max_entries, ttl):
+        super().__init__(max_entries)
+        self.ttl = ttl
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= monotonic():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        super().set(key, (monotonic() + self.ttl, value))
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
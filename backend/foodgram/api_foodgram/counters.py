@@ -0,0 +1,37 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, Recipe, User
+
+
+def change_favorites_count(recipe_id, delta):
+    recipes = Recipe.objects.filter(pk=recipe_id)
+    if delta < 0:
+        recipes = recipes.filter(favorites_count__gte=-delta)
+    recipes.update(favorites_count=F('favorites_count') + delta)
+
+
+def change_recipes_count(user_id, delta):
+    users = User.objects.filter(pk=user_id)
+    if delta < 0:
+        users = users.filter(recipes_count__gte=-delta)
+    users.update(recipes_count=F('recipes_count') + delta)
+
+
+def count_subquery(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(count=Count('pk')).values('count')
+    ), Value(0))
+
+
+def recount():
+    """Пересчитывает счетчики по фактическим данным."""
+    favorites = Recipe.objects.update(
+        favorites_count=count_subquery(Favorite.objects.all(), 'recipes')
+    )
+    recipes = User.objects.update(
+        recipes_count=count_subquery(Recipe.objects.all(), 'author')
+    )
+    return favorites, recipes
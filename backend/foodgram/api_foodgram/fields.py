@@ -0,0 +1,103 @@
+import base64
+import binascii
+import re
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+BASE64_HEADER = ';base64,'
+WHITESPACE = re.compile(r'\s')
+
+
+class DecodedImageFile(TemporaryUploadedFile):
+    """
+    Временный файл с декодированной картинкой. Хранилище переносит его
+    на место, поэтому при сборке мусора файла уже может не быть.
+    """
+
+    def __del__(self):
+        self.close()
+
+
+class StreamingBase64ImageField(serializers.ImageField):
+    """
+    Картинка строкой base64 (data:image/png;base64,...) или файлом
+    из multipart/form-data.
+
+    Размер строки проверяется до декодирования, а сама строка
+    декодируется частями во временный файл, поэтому картинка
+    не копируется в память целиком.
+    """
+    ALLOWED_TYPES = ('jpeg', 'png', 'gif')
+    # Кратно 4, чтобы каждая часть декодировалась отдельно.
+    CHUNK_SIZE = 64 * 1024
+    EMPTY_VALUES = (None, '')
+
+    default_error_messages = {
+        'too_large': 'Размер картинки не должен превышать {max_size} байт.',
+        'invalid_type': 'Допустимые форматы картинки: jpeg, png, gif.',
+    }
+
+    def __init__(self, max_size=None, **kwargs):
+        self.max_size = max_size or settings.MAX_IMAGE_SIZE
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if data in self.EMPTY_VALUES:
+            return None
+        if isinstance(data, str):
+            data = self.decode(data)
+        elif getattr(data, 'size', 0) > self.max_size:
+            self.fail('too_large', max_size=self.max_size)
+        file = super().to_internal_value(data)
+        # Формат, определенный Pillow при проверке, в том числе
+        # для файлов из multipart/form-data.
+        image = getattr(file, 'image', None)
+        if (getattr(image, 'format', None) or '').lower() not in (
+                self.ALLOWED_TYPES
+        ):
+            self.fail('invalid_type')
+        return file
+
+    def get_decoded_size(self, data, start):
+        length = len(data) - start
+        if not length or length % 4:
+            self.fail('invalid_image')
+        padding = 2 if data.endswith('==') else int(data.endswith('='))
+        return length // 4 * 3 - padding
+
+    def decode(self, data):
+        content_type = None
+        start = data.find(BASE64_HEADER, 0, 100)
+        if start == -1:
+            start = 0
+        else:
+            content_type = data[:start].replace('data:', '')
+            start += len(BASE64_HEADER)
+        if WHITESPACE.search(data, start):
+            data, start = ''.join(data[start:].split()), 0
+        size = self.get_decoded_size(data, start)
+        if size > self.max_size:
+            self.fail('too_large', max_size=self.max_size)
+        file = DecodedImageFile('image', content_type, size, None)
+        try:
+            for offset in range(start, len(data), self.CHUNK_SIZE):
+                file.write(base64.b64decode(
+                    data[offset:offset + self.CHUNK_SIZE], validate=True
+                ))
+            file.seek(0)
+            with Image.open(file) as image:
+                image_type = (image.format or '').lower()
+        except (binascii.Error, OSError):
+            file.close()
+            self.fail('invalid_image')
+        if image_type not in self.ALLOWED_TYPES:
+            file.close()
+            self.fail('invalid_type')
+        file.seek(0)
+        extension = 'jpg' if image_type == 'jpeg' else image_type
+        file.name = f'{uuid.uuid4()}.{extension}'
+        return file
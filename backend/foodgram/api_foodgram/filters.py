@@ -1,15 +1,77 @@
+from django.db.models import Exists, OuterRef
+from django_filters.constants import EMPTY_VALUES
 from django_filters.rest_framework import FilterSet, filters
 from rest_framework.filters import SearchFilter
 
-from .models import Recipe
+from .models import Recipe, RecipeTag, Tag
+from .routers import use_primary
+from .search import search_recipes
+from .versions import get_version, TAG_VERSION
+
+
+class TagIds:
+    """
+    Соответствие slug -> id тегов. Хранится в воркере и
+    перезагружается при смене версии тегов.
+    """
+
+    def __init__(self):
+        self.entry = (None, {})
+
+    def get(self):
+        version = get_version(TAG_VERSION)
+        if self.entry[0] != version:
+            with use_primary():
+                ids = dict(Tag.objects.values_list('slug', 'id'))
+            self.entry = (version, ids)
+        return self.entry[1]
+
+
+tag_ids = TagIds()
+
+
+class TagSlugFilter(filters.MultipleChoiceFilter):
+    """
+    Рецепты хотя бы с одним из тегов. Slug проверяются по tag_ids
+    без запроса к БД, а рецепты отбираются подзапросом EXISTS
+    по RecipeTag, поэтому не дублируются и не требуют DISTINCT.
+    """
+
+    @property
+    def field(self):
+        self.extra['choices'] = [(slug, slug) for slug in tag_ids.get()]
+        return super().field
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ids = tag_ids.get()
+        return qs.filter(Exists(RecipeTag.objects.filter(
+            recipes=OuterRef('pk'),
+            tags_id__in=[ids[slug] for slug in value if slug in ids]
+        )))
+
+
+class RecipeOrderingFilter(filters.OrderingFilter):
+    """Сортировка с добавлением -id, чтобы порядок страниц был стабильным."""
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        return qs.order_by(*ordering, '-id')
 
 
 class RecipeFilter(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = TagSlugFilter()
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='get_search')
+    ordering = RecipeOrderingFilter(
+        fields=(('favorites_count', 'popularity'),)
+    )
 
     def get_is_favorited(self, queryset, value, name):
         if value and not self.request.user.is_anonymous:
@@ -21,6 +83,11 @@ class RecipeFilter(FilterSet):
             return queryset.filter(shopping__user=self.request.user)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return search_recipes(queryset, value)
+
     class Meta:
         model = Recipe
         fields = ('author', 'tags')
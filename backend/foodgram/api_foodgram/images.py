@@ -0,0 +1,175 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Recipe
+from .storage import get_shard, lock_name
+from .versions import bump_version, RECIPE_VERSION
+
+logger = logging.getLogger(__name__)
+image_storage = Recipe._meta.get_field('image').storage
+
+VARIANTS_DIR = 'recipes/variants'
+# Размер, в который вписывается картинка, для каждой копии.
+VARIANT_SIZES = {
+    'card': (640, 480),
+    'thumbnail': (200, 200),
+}
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+executor = ThreadPoolExecutor(
+    max_workers=max(settings.IMAGE_WORKERS, 1),
+    thread_name_prefix='image-variants'
+)
+
+
+def get_variant_names(image_name):
+    """
+    Пути копий картинки в хранилище:
+    {'card': {'webp': ..., 'jpeg': ...}, 'thumbnail': {...}}.
+    """
+    if not image_name:
+        return {}
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    directory = f'{VARIANTS_DIR}/{get_shard(stem)}'
+    return {
+        variant: {
+            extension: f'{directory}/{stem}_{variant}.{extension}'
+            for extension in VARIANT_FORMATS
+        }
+        for variant in VARIANT_SIZES
+    }
+
+
+def get_variant_urls(variants, request=None):
+    urls = {}
+    for variant, names in variants.items():
+        urls[variant] = {}
+        for extension, name in names.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[variant][extension] = url
+    return urls
+
+
+def render_variants(image):
+    """Копии открытой картинки: {(variant, extension): bytes}."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        image = image.convert('RGBA')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    rendered = {}
+    for variant, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        for extension, (image_format, options) in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            rendered[variant, extension] = buffer.getvalue()
+    return rendered
+
+
+def generate_variants(recipe_id):
+    """
+    Создает копии картинки рецепта и записывает их пути в
+    image_variants. Возвращает True, если копии были созданы.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).values(
+        'image', 'image_variants'
+    ).first()
+    if recipe is None or not recipe['image']:
+        return False
+    image_name = recipe['image']
+    names = get_variant_names(image_name)
+    with image_storage.open(image_name) as file:
+        with Image.open(file) as image:
+            rendered = render_variants(image)
+    for (variant, extension), content in rendered.items():
+        name = names[variant][extension]
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(content))
+    updated = Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        image_variants=names
+    )
+    if not updated:
+        # Картинку успели заменить, копии устарели.
+        delete_variants(names, recipe_id)
+        return False
+    if recipe['image_variants'] != names:
+        delete_variants(recipe['image_variants'], recipe_id)
+    bump_version(RECIPE_VERSION.format(recipe_id))
+    return True
+
+
+def delete_variants(variants, recipe_id):
+    """
+    Удаляет копии, если они не нужны другим рецептам с той же
+    картинкой.
+    """
+    if not variants:
+        return
+    variant, names = next(iter(variants.items()))
+    extension, name = next(iter(names.items()))
+    if Recipe.objects.exclude(pk=recipe_id).filter(
+            **{f'image_variants__{variant}__{extension}': name}
+    ).exists():
+        return
+    for names in variants.values():
+        for name in names.values():
+            default_storage.delete(name)
+
+
+def delete_unused_image(name):
+    """Удаляет картинку и ее копии, если она больше не нужна рецептам."""
+    if not name:
+        return
+    with transaction.atomic():
+        lock_name(name)
+        if Recipe.objects.filter(image=name).exists():
+            return
+        image_storage.delete(name)
+        delete_variants(get_variant_names(name), None)
+
+
+def run_generate_variants(recipe_id):
+    try:
+        generate_variants(recipe_id)
+    except Exception:
+        logger.exception(
+            'Не удалось создать копии картинки рецепта %s', recipe_id
+        )
+
+
+def run_in_worker(recipe_id):
+    close_old_connections()
+    try:
+        run_generate_variants(recipe_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(recipe_id):
+    """
+    Ставит создание копий в очередь после фиксации транзакции.
+    При IMAGE_WORKERS = 0 копии создаются сразу в текущем потоке.
+    """
+    if settings.IMAGE_WORKERS:
+        transaction.on_commit(
+            lambda: executor.submit(run_in_worker, recipe_id)
+        )
+    else:
+        transaction.on_commit(lambda: run_generate_variants(recipe_id))
@@ -0,0 +1,230 @@
+import json
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.db import connection, DatabaseError, transaction
+
+from .counters import change_recipes_count
+from .images import schedule_variants
+from .models import Amount, Ingredient, Recipe, RecipeTag, Tag, User
+from .search import update_search_index
+
+MAX_AMOUNT = 32767
+
+
+class ImportLineError(Exception):
+    pass
+
+
+def is_id(value):
+    # bool - подкласс int, но id не бывает True/False.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def get_list(data, field, message):
+    value = data.get(field)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ImportLineError(message)
+    return value
+
+
+class RecipeImporter:
+    """
+    Потоковый импорт рецептов из NDJSON: одна строка - один рецепт.
+
+    {"name": "...", "text": "...", "cooking_time": 10,
+     "author": 1 | "user@mail.ru", "tags": ["breakfast", 2],
+     "ingredients": [{"id": 1, "amount": 10},
+                     {"name": "соль", "measurement_unit": "г", "amount": 5}],
+     "image": "recipes/existing.png"}
+
+    Теги и ингредиенты проверяются по словарям в памяти, рецепты
+    вставляются пачками по batch_size через bulk_create. Ошибочные
+    строки пропускаются и попадают в errors, остальные загружаются.
+    """
+
+    def __init__(self, default_author=None, batch_size=500):
+        self.default_author = default_author
+        self.batch_size = batch_size
+        self.tags = {}
+        for tag_id, slug in Tag.objects.values_list('id', 'slug'):
+            self.tags[slug] = tag_id
+            self.tags[tag_id] = tag_id
+        self.ingredient_ids = set()
+        self.ingredients = {}
+        for ingredient_id, name, unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+        ):
+            self.ingredient_ids.add(ingredient_id)
+            self.ingredients[(name.lower(), unit)] = ingredient_id
+        self.authors = {}
+        self.created = 0
+        self.errors = []
+
+    def run(self, lines):
+        batch = []
+        for line_number, line in enumerate(lines, 1):
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                if not line.strip():
+                    continue
+                batch.append((line_number, self.parse(line)))
+            except UnicodeDecodeError:
+                self.errors.append((line_number, 'Строка не в UTF-8.'))
+            except (ImportLineError, TypeError, ValueError) as error:
+                self.errors.append((line_number, str(error)))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+        return self
+
+    def get_author_id(self, value):
+        if value is None:
+            if self.default_author is None:
+                raise ImportLineError('Не указан автор.')
+            return self.default_author.pk
+        if not is_id(value) and not isinstance(value, str):
+            raise ImportLineError('Неверный автор.')
+        if value not in self.authors:
+            lookup = {'email': value} if isinstance(value, str) else {
+                'pk': value
+            }
+            self.authors[value] = User.objects.filter(
+                **lookup
+            ).values_list('pk', flat=True).first()
+        if self.authors[value] is None:
+            raise ImportLineError(f'Автор {value} не найден.')
+        return self.authors[value]
+
+    def get_ingredient_id(self, item):
+        if 'id' in item:
+            if not is_id(item['id']) or item['id'] not in self.ingredient_ids:
+                raise ImportLineError(f'Ингредиент {item["id"]} не найден.')
+            return item['id']
+        name = item.get('name')
+        unit = item.get('measurement_unit')
+        if not isinstance(name, str) or not isinstance(unit, str):
+            raise ImportLineError('Неверный ингредиент.')
+        key = (name.lower(), unit)
+        if key not in self.ingredients:
+            raise ImportLineError(f'Ингредиент {key[0]} не найден.')
+        return self.ingredients[key]
+
+    def parse_tags(self, tags):
+        tag_ids = []
+        for tag in tags:
+            valid = is_id(tag) or isinstance(tag, str)
+            if not valid or tag not in self.tags:
+                raise ImportLineError(f'Тег {tag} не найден.')
+            tag_ids.append(self.tags[tag])
+        if len(set(tag_ids)) != len(tag_ids):
+            raise ImportLineError('Тэги не должны повторяться!')
+        return tag_ids
+
+    def parse_amounts(self, ingredients):
+        amounts = {}
+        for item in ingredients:
+            if not isinstance(item, dict):
+                raise ImportLineError('Неверный ингредиент.')
+            ingredient_id = self.get_ingredient_id(item)
+            amount = item.get('amount')
+            if not isinstance(amount, int) or not 1 <= amount <= MAX_AMOUNT:
+                raise ImportLineError('Неверное количество ингредиента.')
+            if ingredient_id in amounts:
+                raise ImportLineError('Ингредиенты не должны повторяться!')
+            amounts[ingredient_id] = amount
+        if not amounts:
+            raise ImportLineError('Не указаны ингредиенты.')
+        return amounts
+
+    def parse(self, line):
+        try:
+            data = json.loads(line)
+        except ValueError as error:
+            raise ImportLineError(f'Неверный JSON: {error}')
+        if not isinstance(data, dict):
+            raise ImportLineError('Ожидается объект JSON.')
+        name = data.get('name')
+        text = data.get('text')
+        cooking_time = data.get('cooking_time')
+        if not isinstance(name, str) or not name or len(name) > 200:
+            raise ImportLineError('Неверное название.')
+        if not isinstance(text, str) or not text:
+            raise ImportLineError('Неверный текст.')
+        if not isinstance(cooking_time, int) or not (
+                1 <= cooking_time <= MAX_AMOUNT
+        ):
+            raise ImportLineError('Неверное время приготовления.')
+        tag_ids = self.parse_tags(
+            get_list(data, 'tags', 'Теги должны быть списком.')
+        )
+        amounts = self.parse_amounts(
+            get_list(data, 'ingredients', 'Ингредиенты должны быть списком.')
+        )
+        image = data.get('image') or None
+        if image is not None and not isinstance(image, str):
+            raise ImportLineError('Неверная картинка.')
+        if image is not None and not default_storage.exists(image):
+            raise ImportLineError(f'Картинка {image} не найдена.')
+        recipe = Recipe(
+            author_id=self.get_author_id(data.get('author')),
+            name=name,
+            text=text,
+            cooking_time=cooking_time,
+            image=image
+        )
+        return recipe, tag_ids, amounts
+
+    def flush(self, batch):
+        if not batch:
+            return
+        try:
+            self.insert([item for line_number, item in batch])
+        except DatabaseError as error:
+            for line_number, (recipe, tag_ids, amounts) in batch:
+                recipe.pk = None
+                recipe._state.adding = True
+            if len(batch) == 1:
+                self.errors.append((batch[0][0], str(error)))
+                return
+            for line in batch:
+                self.flush([line])
+            return
+        self.created += len(batch)
+
+    @transaction.atomic
+    def insert(self, items):
+        recipes = [recipe for recipe, tag_ids, amounts in items]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Recipe.objects.bulk_create(recipes)
+            for author_id, count in Counter(
+                    recipe.author_id for recipe in recipes
+            ).items():
+                change_recipes_count(author_id, count)
+            recipe_ids = [recipe.pk for recipe in recipes]
+            transaction.on_commit(lambda: update_search_index(recipe_ids))
+            for recipe in recipes:
+                if recipe.image:
+                    schedule_variants(recipe.pk)
+        else:
+            # Без RETURNING (SQLite) id новых строк неизвестны, поэтому
+            # рецепты сохраняются по одному, а счетчики и поиск
+            # обновляют сигналы.
+            for recipe in recipes:
+                recipe.save(force_insert=True)
+        RecipeTag.objects.bulk_create([
+            RecipeTag(recipes=recipe, tags_id=tag_id)
+            for recipe, tag_ids, amounts in items
+            for tag_id in tag_ids
+        ])
+        Amount.objects.bulk_create([
+            Amount(
+                recipes=recipe, ingredients_id=ingredient_id, amount=amount
+            )
+            for recipe, tag_ids, amounts in items
+            for ingredient_id, amount in amounts.items()
+        ])
@@ -0,0 +1,164 @@
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from threading import Lock
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Ingredient
+from .payloads import get_ingredient_payloads
+from .routers import use_primary
+from .versions import get_version, INGREDIENT_VERSION
+
+SEARCH_LIMIT = 50
+# Порог похожести, как word_similarity_threshold в pg_trgm.
+SIMILARITY_THRESHOLD = 0.6
+INGREDIENT_TABLE = Ingredient._meta.db_table
+WORD = re.compile(r'\w+')
+
+
+def get_trigrams(text):
+    """
+    Триграммы слов текста, как в pg_trgm: слово дополняется двумя
+    пробелами в начале и одним в конце.
+    """
+    trigrams = set()
+    for word in WORD.findall(text.lower()):
+        word = f'  {word} '
+        trigrams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return trigrams
+
+
+class IngredientIndex:
+    """
+    Отсортированный массив названий ингредиентов для поиска по префиксу
+    и триграммы названий для нечеткого поиска. Строится один раз
+    на воркер и перестраивается при смене версии таблицы ингредиентов.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.entries = ([], [], {})
+        self.lock = Lock()
+
+    def build(self, version):
+        with use_primary():
+            rows = list(Ingredient.objects.values(
+                'id', 'name', 'measurement_unit'
+            ))
+        rows.sort(
+            key=lambda row: (row['name'].lower(), row['name'], row['id'])
+        )
+        trigrams = defaultdict(list)
+        for position, row in enumerate(rows):
+            for trigram in get_trigrams(row['name']):
+                trigrams[trigram].append(position)
+        self.entries = (
+            [row['name'].lower() for row in rows], rows, dict(trigrams)
+        )
+        self.version = version
+
+    def refresh(self):
+        """
+        Перестраивает устаревший индекс. Возвращает False, если его
+        в этот момент перестраивает другой поток.
+        """
+        version = get_version(INGREDIENT_VERSION)
+        if self.version == version:
+            return True
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            if self.version != version:
+                self.build(version)
+        finally:
+            self.lock.release()
+        return True
+
+    def search(self, prefix, limit=SEARCH_LIMIT):
+        """
+        Ингредиенты, название которых начинается с prefix (без учета
+        регистра). Возвращает None, если индекс не готов: в этот момент
+        его перестраивает другой поток, и запрос нужно обслужить из БД.
+        """
+        if not self.refresh():
+            return None
+        keys, rows, _ = self.entries
+        prefix = prefix.lower()
+        result = []
+        position = bisect_left(keys, prefix)
+        while (
+            position < len(keys) and len(result) < limit
+            and keys[position].startswith(prefix)
+        ):
+            result.append(rows[position])
+            position += 1
+        return result
+
+    def search_similar(self, query, exclude_ids=(), limit=SEARCH_LIMIT):
+        """
+        Ингредиенты, в названии которых есть слово, похожее на query:
+        доля общих триграмм не ниже SIMILARITY_THRESHOLD. Сортируются
+        по убыванию похожести. Возвращает None, если индекс не готов.
+        """
+        if not self.refresh():
+            return None
+        _, rows, trigrams = self.entries
+        query_trigrams = get_trigrams(query)
+        if not query_trigrams:
+            return []
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(trigrams.get(trigram, ()))
+        minimum = SIMILARITY_THRESHOLD * len(query_trigrams)
+        exclude_ids = set(exclude_ids)
+        positions = sorted(
+            (-count, position) for position, count in shared.items()
+            if count >= minimum and rows[position]['id'] not in exclude_ids
+        )
+        return [rows[position] for _, position in positions[:limit]]
+
+
+ingredient_index = IngredientIndex()
+trigram_extension = {}
+
+
+def has_trigram_extension():
+    """Установлено ли в БД расширение pg_trgm (проверяется один раз)."""
+    if connection.vendor != 'postgresql':
+        return False
+    if connection.alias not in trigram_extension:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            trigram_extension[connection.alias] = (
+                cursor.fetchone() is not None
+            )
+    return trigram_extension[connection.alias]
+
+
+def search_similar_ingredients(query, exclude_ids=(), limit=SEARCH_LIMIT):
+    """
+    Нечеткий поиск ингредиентов: опечатки и совпадения в середине
+    названия. В PostgreSQL - через pg_trgm и GIN-индекс по названию,
+    без pg_trgm - по триграммам из индекса воркера.
+    """
+    if limit <= 0:
+        return []
+    if not has_trigram_extension():
+        return ingredient_index.search_similar(query, exclude_ids, limit) or []
+    return get_ingredient_payloads(
+        Ingredient.objects.filter(RawSQL(
+            f'%s <%% {INGREDIENT_TABLE}.name', (query,),
+            output_field=BooleanField()
+        )).exclude(pk__in=list(exclude_ids)).annotate(
+            similarity=RawSQL(
+                f'word_similarity(%s, {INGREDIENT_TABLE}.name)', (query,),
+                output_field=FloatField()
+            )
+        ).order_by('-similarity', 'name'),
+        limit
+    )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from api_foodgram.images import generate_variants, get_variant_names
+from api_foodgram.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создает уменьшенные копии картинок существующих рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='regenerate',
+            help='Пересоздать копии и для рецептов, у которых они уже есть.'
+        )
+
+    def handle(self, *args, regenerate=False, **options):
+        recipes = Recipe.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).values_list('pk', 'image', 'image_variants').order_by('pk')
+        created = failed = 0
+        for recipe_id, image, variants in recipes.iterator():
+            if not regenerate and variants == get_variant_names(image):
+                continue
+            try:
+                if generate_variants(recipe_id):
+                    created += 1
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'Рецепт {recipe_id}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Созданы копии картинок рецептов: {created}, ошибок: {failed}.'
+        ))
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_foodgram.importers import RecipeImporter
+from api_foodgram.models import User
+
+
+class Command(BaseCommand):
+    help = 'Импортирует рецепты из файла NDJSON (одна строка - один рецепт).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdin.')
+        parser.add_argument(
+            '--author',
+            help='email автора для строк, в которых автор не указан.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, path, author=None, batch_size=500, **options):
+        default_author = None
+        if author is not None:
+            default_author = User.objects.filter(email=author).first()
+            if default_author is None:
+                raise CommandError(f'Пользователь {author} не найден.')
+        importer = RecipeImporter(default_author, batch_size)
+        if path == '-':
+            importer.run(sys.stdin)
+        else:
+            with open(path, encoding='utf-8') as lines:
+                importer.run(lines)
+        for line_number, error in importer.errors:
+            self.stderr.write(f'Строка {line_number}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено рецептов: {importer.created}, '
+            f'ошибок: {len(importer.errors)}.'
+        ))
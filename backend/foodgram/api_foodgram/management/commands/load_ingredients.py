@@ -0,0 +1,149 @@
+import csv
+import json
+import os
+from io import StringIO
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api_foodgram.models import Ingredient
+from api_foodgram.versions import bump_version, INGREDIENT_VERSION
+
+INGREDIENT_TABLE = Ingredient._meta.db_table
+STAGING_TABLE = 'ingredient_staging'
+MAX_LENGTH = 200
+DEFAULT_PATH = os.path.join(settings.BASE_DIR, 'fixtures', 'ingredients.json')
+
+
+def read_rows(path):
+    """
+    Строки (name, measurement_unit) из CSV без заголовка или из JSON:
+    списка объектов или фикстуры Django.
+    """
+    with open(path, encoding='utf-8') as file:
+        if path.endswith('.json'):
+            for item in json.load(file):
+                fields = item.get('fields', item)
+                yield fields.get('name'), fields.get('measurement_unit')
+        else:
+            for row in csv.reader(file):
+                if row:
+                    yield tuple(row[:2]) if len(row) >= 2 else (row[0], None)
+
+
+def clean_rows(rows):
+    for name, measurement_unit in rows:
+        name = (name or '').strip()
+        measurement_unit = (measurement_unit or '').strip()
+        if not name:
+            raise CommandError('Не указано название ингредиента.')
+        if len(name) > MAX_LENGTH or len(measurement_unit) > MAX_LENGTH:
+            raise CommandError(f'Слишком длинное значение: {name}')
+        yield name, measurement_unit
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_size))
+
+
+def load_with_copy(rows, batch_size):
+    """
+    Загружает строки через COPY во временную таблицу и добавляет
+    одним запросом те, которых еще нет. Возвращает (всего, добавлено).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMP TABLE {STAGING_TABLE} '
+            f'(name varchar({MAX_LENGTH}), '
+            f'measurement_unit varchar({MAX_LENGTH})) ON COMMIT DROP'
+        )
+        for batch in batches(rows, batch_size):
+            buffer = StringIO()
+            csv.writer(buffer).writerows(batch)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f'COPY {STAGING_TABLE} FROM STDIN WITH (FORMAT csv, '
+                f'FORCE_NOT_NULL (name, measurement_unit))',
+                buffer
+            )
+        # Параллельный запуск (например, на двух контейнерах при деплое)
+        # ждет окончания этого, чтобы не добавить одни и те же строки.
+        cursor.execute(
+            f'LOCK TABLE {INGREDIENT_TABLE} IN SHARE ROW EXCLUSIVE MODE'
+        )
+        cursor.execute(
+            f'SELECT count(*) FROM (SELECT DISTINCT name, measurement_unit '
+            f'FROM {STAGING_TABLE}) AS rows'
+        )
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f'INSERT INTO {INGREDIENT_TABLE} (name, measurement_unit) '
+            f'SELECT DISTINCT staging.name, staging.measurement_unit '
+            f'FROM {STAGING_TABLE} AS staging WHERE NOT EXISTS ('
+            f'SELECT 1 FROM {INGREDIENT_TABLE} AS ingredient '
+            f'WHERE ingredient.name = staging.name '
+            f'AND ingredient.measurement_unit = staging.measurement_unit)'
+        )
+        return total, cursor.rowcount
+
+
+def load_with_orm(rows, batch_size):
+    """То же через bulk_create для баз без COPY."""
+    existing = set(
+        Ingredient.objects.values_list('name', 'measurement_unit')
+    )
+    loaded = set()
+    inserted = 0
+    for batch in batches(rows, batch_size):
+        new = []
+        for key in batch:
+            if key in loaded:
+                continue
+            loaded.add(key)
+            if key not in existing:
+                new.append(Ingredient(name=key[0], measurement_unit=key[1]))
+        Ingredient.objects.bulk_create(new)
+        inserted += len(new)
+    return len(loaded), inserted
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты из CSV или JSON. Уже существующие '
+        'пары (название, единица измерения) пропускаются, поэтому '
+        'команду можно запускать при каждом деплое.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default=DEFAULT_PATH,
+            help='Путь к файлу .csv или .json.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, path, batch_size=5000, **options):
+        rows = clean_rows(read_rows(path))
+        try:
+            with transaction.atomic():
+                if connection.vendor == 'postgresql':
+                    total, inserted = load_with_copy(rows, batch_size)
+                else:
+                    total, inserted = load_with_orm(rows, batch_size)
+                if inserted:
+                    bump_version(INGREDIENT_VERSION)
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+        except (ValueError, AttributeError) as error:
+            raise CommandError(f'Неверный формат файла {path}: {error}')
+        # Ключ - вся строка целиком, поэтому существующие записи
+        # не изменяются, а только пропускаются.
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено: {inserted}, обновлено: 0, '
+            f'без изменений: {total - inserted}.'
+        ))
@@ -0,0 +1,49 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from api_foodgram.models import ShoppingListItem
+from api_foodgram.shopping_list import calculate_totals, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает или сверяет списки покупок с корзинами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='id пользователя (можно указать несколько раз).'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сверить и показать расхождения, без записи.'
+        )
+
+    def handle(self, *args, users=None, check=False, **options):
+        if not check:
+            rebuild(users)
+            self.stdout.write(self.style.SUCCESS(
+                'Списки покупок перестроены.'
+            ))
+            return
+        expected = calculate_totals(users)
+        actual = defaultdict(dict)
+        items = ShoppingListItem.objects.all()
+        if users is not None:
+            items = items.filter(user_id__in=users)
+        for user_id, ingredient_id, total in items.values_list(
+                'user_id', 'ingredient_id', 'total'
+        ):
+            actual[user_id][ingredient_id] = total
+        mismatched = sorted(
+            user_id for user_id in set(expected) | set(actual)
+            if expected.get(user_id, {}) != actual.get(user_id, {})
+        )
+        for user_id in mismatched:
+            self.stdout.write(f'Расхождение у пользователя {user_id}')
+        if mismatched:
+            self.stdout.write(self.style.WARNING(
+                f'Пользователей с расхождениями: {len(mismatched)}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
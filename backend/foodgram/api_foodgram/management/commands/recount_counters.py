@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api_foodgram.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики избранного и рецептов.'
+
+    def handle(self, *args, **options):
+        recipes, users = recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано рецептов: {recipes}, пользователей: {users}.'
+        ))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api_foodgram.images import image_storage, run_generate_variants
+from api_foodgram.models import Recipe
+from api_foodgram.storage import is_hashed_name
+from api_foodgram.versions import bump_version, RECIPE_VERSION
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки рецептов в хранилище с именами по хэшу '
+        'содержимого. Одинаковые картинки сохраняются один раз.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, сколько картинок будет перенесено.'
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        names = list(Recipe.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).values_list('image', flat=True).distinct().order_by('image'))
+        names = [name for name in names if not is_hashed_name(name)]
+        renamed, missing, hashed_names = 0, 0, set()
+        for name in names:
+            if not image_storage.exists(name):
+                missing += 1
+                self.stderr.write(f'Файл не найден: {name}')
+                continue
+            if dry_run:
+                renamed += 1
+                continue
+            with transaction.atomic():
+                # Файл сохраняется в одной транзакции с обновлением
+                # рецептов: до фиксации его нельзя удалить как
+                # неиспользуемый (storage.lock_name).
+                with image_storage.open(name) as file:
+                    hashed_name = image_storage.save(name, file)
+                recipe_ids = list(Recipe.objects.filter(
+                    image=name
+                ).values_list('pk', flat=True))
+                Recipe.objects.filter(pk__in=recipe_ids).update(
+                    image=hashed_name
+                )
+                for recipe_id in recipe_ids:
+                    bump_version(RECIPE_VERSION.format(recipe_id))
+            image_storage.delete(name)
+            for recipe_id in recipe_ids:
+                run_generate_variants(recipe_id)
+            renamed += 1
+            hashed_names.add(hashed_name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено картинок: {renamed}, '
+            f'уникальных: {len(hashed_names)}, не найдено: {missing}.'
+        ))
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+FTS_TABLE = 'api_foodgram_recipe_fts'
+
+POSTGRES_FORWARDS = [
+    'ALTER TABLE api_foodgram_recipe ADD COLUMN search_vector tsvector',
+    'CREATE INDEX api_foodgram_recipe_search_vector_gin '
+    'ON api_foodgram_recipe USING gin (search_vector)',
+]
+POSTGRES_BACKWARDS = [
+    'DROP INDEX IF EXISTS api_foodgram_recipe_search_vector_gin',
+    'ALTER TABLE api_foodgram_recipe DROP COLUMN IF EXISTS search_vector',
+]
+SQLITE_FORWARDS = [
+    f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+    f"name, ingredients, text, tokenize='unicode61 remove_diacritics 2')",
+]
+SQLITE_BACKWARDS = [
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def create_search_index(apps, schema_editor):
+    from api_foodgram.search import update_search_index
+
+    vendor = schema_editor.connection.vendor
+    statements = {
+        'postgresql': POSTGRES_FORWARDS,
+        'sqlite': SQLITE_FORWARDS,
+    }.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+    if statements:
+        update_search_index()
+
+
+def drop_search_index(apps, schema_editor):
+    statements = {
+        'postgresql': POSTGRES_BACKWARDS,
+        'sqlite': SQLITE_BACKWARDS,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_foodgram', '0002_shopping_list_item'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
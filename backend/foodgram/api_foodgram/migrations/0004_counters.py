@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:30
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(models.Subquery(
+        model.objects.filter(**{field: models.OuterRef('pk')}).order_by(
+        ).values(field).annotate(
+            count=models.Count('pk')
+        ).values('count')
+    ), models.Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    Favorite = apps.get_model('api_foodgram', 'Favorite')
+    Recipe = apps.get_model('api_foodgram', 'Recipe')
+    User = apps.get_model('api_foodgram', 'User')
+    Recipe.objects.update(favorites_count=count_subquery(Favorite, 'recipes'))
+    User.objects.update(recipes_count=count_subquery(Recipe, 'author'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_foodgram', '0003_recipe_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Количество добавлений в избранное'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество рецептов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:49
+
+import api_foodgram.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_foodgram', '0005_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=api_foodgram.storage.ContentAddressedStorage(), upload_to='recipes/'),
+        ),
+    ]
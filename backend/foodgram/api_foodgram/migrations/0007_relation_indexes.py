@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:02
+
+from django.db import migrations, models
+
+
+def delete_duplicate_subscribers(apps, schema_editor):
+    """Оставляет одну подписку на каждую пару пользователь - автор."""
+    Subscriber = apps.get_model('api_foodgram', 'Subscriber')
+    first_ids = Subscriber.objects.order_by().values(
+        'user', 'subscribed'
+    ).annotate(first_id=models.Min('id')).values_list('first_id', flat=True)
+    Subscriber.objects.exclude(id__in=list(first_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_foodgram', '0006_recipe_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='amount',
+            index=models.Index(fields=['recipes', 'ingredients'], include=('amount',), name='amount_recipe_ingredient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', 'recipes'], name='favorite_user_recipe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipetag',
+            index=models.Index(fields=['tags', 'recipes'], name='recipe_tag_tag_recipe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingcart',
+            index=models.Index(fields=['user', 'recipe'], name='cart_user_recipe_idx'),
+        ),
+        migrations.RunPython(
+            delete_duplicate_subscribers, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='subscriber',
+            constraint=models.UniqueConstraint(fields=('user', 'subscribed'), name='unique subscriber'),
+        ),
+    ]
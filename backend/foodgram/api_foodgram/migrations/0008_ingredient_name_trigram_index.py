@@ -0,0 +1,42 @@
+from django.db import migrations
+
+POSTGRES_FORWARDS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX api_foodgram_ingredient_name_trgm '
+    'ON api_foodgram_ingredient USING gin (name gin_trgm_ops)',
+]
+POSTGRES_BACKWARDS = [
+    'DROP INDEX IF EXISTS api_foodgram_ingredient_name_trgm',
+]
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            # Без contrib нечеткий поиск работает по индексу воркера.
+            return
+    for statement in POSTGRES_FORWARDS:
+        schema_editor.execute(statement)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in POSTGRES_BACKWARDS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_foodgram', '0007_relation_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,5 +1,12 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import mixins, viewsets
 
+from .cache import rendered_cache
+from .routers import use_primary
+from .versions import get_version
+
 
 class ListRetrieveViewSet(mixins.ListModelMixin,
                           mixins.RetrieveModelMixin,
@@ -12,3 +19,48 @@ class CreateDestroyViewSet(mixins.CreateModelMixin,
                            viewsets.GenericViewSet):
 
     pass
+
+
+class CachedListMixin:
+    """
+    Отдает список без параметров из кэша воркера готовым JSON.
+    Кэш сбрасывается при смене версии list_cache_version, ответы
+    снабжаются ETag и Cache-Control, на If-None-Match отвечает 304.
+    Данные для кэша собирает get_list_data.
+    """
+    list_cache_version = None
+    list_cache_max_age = 60
+
+    def get_list_data(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs).data
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        key = type(self).__name__
+        version = get_version(self.list_cache_version)
+        entry = rendered_cache.get(key, version)
+        if entry is None:
+            with use_primary():
+                data = self.get_list_data(request, *args, **kwargs)
+            entry = rendered_cache.set(
+                key, version, request.accepted_renderer.render(data)
+            )
+        body, etag = entry.body, entry.etag
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if entry.gzip_body is not None and 'gzip' in accept_encoding:
+            body, etag = entry.gzip_body, entry.gzip_etag
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                body, content_type=request.accepted_renderer.media_type
+            )
+            if body is entry.gzip_body:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        response['Cache-Control'] = (
+            f'public, max-age={self.list_cache_max_age}'
+        )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -3,6 +3,7 @@ from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
+from .storage import recipe_image_storage
 from .validators import validate_username, min_value_validator
 
 
@@ -38,6 +39,11 @@ class User(AbstractUser):
         _('Фамилия'),
         max_length=150,
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+        editable=False
+    )
 
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     USERNAME_FIELD = 'email'
@@ -69,6 +75,12 @@ class Subscriber(models.Model):
         ordering = ['-id']
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'subscribed'],
+                name='unique subscriber'
+            )
+        ]
 
 
 class Tag(models.Model):
@@ -137,9 +149,16 @@ class Recipe(models.Model):
         max_length=200)
     image = models.ImageField(
         upload_to='recipes/',
+        storage=recipe_image_storage,
         null=True,
         blank=True
     )
+    image_variants = models.JSONField(
+        verbose_name='Уменьшенные копии картинки',
+        default=dict,
+        blank=True,
+        editable=False
+    )
     text = models.TextField(
         verbose_name='Текст',
         max_length=256
@@ -152,6 +171,12 @@ class Recipe(models.Model):
         User,
         through='Favorite'
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='Количество добавлений в избранное',
+        default=0,
+        editable=False,
+        db_index=True
+    )
 
     class Meta:
         ordering = ['-id']
@@ -176,6 +201,12 @@ class RecipeTag(models.Model):
                 name='unique recipe_tag'
             )
         ]
+        indexes = [
+            # Фильтр рецептов по тегу.
+            models.Index(
+                fields=['tags', 'recipes'], name='recipe_tag_tag_recipe_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.recipes} {self.tags}'
@@ -201,6 +232,12 @@ class Favorite(models.Model):
                 name='unique favorite'
             )
         ]
+        indexes = [
+            # Избранное пользователя: is_favorited и фильтр рецептов.
+            models.Index(
+                fields=['user', 'recipes'], name='favorite_user_recipe_idx'
+            ),
+        ]
 
 
 class Amount(models.Model):
@@ -224,6 +261,14 @@ class Amount(models.Model):
         ordering = ['-id']
         verbose_name = 'Количество ингредиента'
         verbose_name_plural = 'Количество ингредиентов'
+        indexes = [
+            # Состав рецепта читается без обращения к таблице
+            # (include поддерживается только в PostgreSQL).
+            models.Index(
+                fields=['recipes', 'ingredients'], include=['amount'],
+                name='amount_recipe_ingredient_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.amount}'
@@ -253,3 +298,41 @@ class ShoppingCart(models.Model):
                 name='unique shopping_cart'
             )
         ]
+        indexes = [
+            # Корзина пользователя: is_in_shopping_cart и фильтр рецептов.
+            models.Index(
+                fields=['user', 'recipe'], name='cart_user_recipe_idx'
+            ),
+        ]
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        related_name='shopping_list',
+        on_delete=models.CASCADE,
+        verbose_name='Покупатель'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        related_name='shopping_list',
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент'
+    )
+    total = models.PositiveIntegerField(
+        verbose_name='Общее кол-во ингредиента'
+    )
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Позиция списка покупок'
+        verbose_name_plural = 'Позиции списка покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique shopping_list_item'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.ingredient} {self.total}'
@@ -1,10 +1,40 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class UserPagination(PageNumberPagination):
     page_size = 6
 
 
+class FoodgramCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = '-id'
+
+
 class FoodgramPagePagination(PageNumberPagination):
+    """
+    Постраничная пагинация page/limit. С параметром pagination=cursor
+    (или cursor) переключается на курсорную пагинацию по -id без
+    COUNT(*) и OFFSET; ссылки next/previous сохраняют фильтры запроса.
+    """
     page_size = 6
     page_size_query_param = 'limit'
+    mode_query_param = 'pagination'
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (
+            params.get(self.mode_query_param) == 'cursor'
+            or FoodgramCursorPagination.cursor_query_param in params
+        ):
+            self.cursor_paginator = FoodgramCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
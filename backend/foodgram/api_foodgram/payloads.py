@@ -0,0 +1,100 @@
+from collections import defaultdict
+
+from .images import get_variant_urls, image_storage
+from .models import Amount, Recipe, RecipeTag
+
+TAG_FIELDS = ('id', 'name', 'color', 'slug')
+INGREDIENT_FIELDS = ('id', 'name', 'measurement_unit')
+AUTHOR_FIELDS = ('email', 'id', 'username', 'first_name', 'last_name')
+
+
+def tag_payload(row):
+    """Тег в формате TagSerializer из строки values()."""
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'color': f'{row["color"]}',
+        'slug': row['slug'],
+    }
+
+
+def get_tag_payloads(queryset):
+    return [tag_payload(row) for row in queryset.values(*TAG_FIELDS)]
+
+
+def get_ingredient_payloads(queryset, limit=None):
+    """Ингредиенты в формате IngredientSerializerGet."""
+    rows = queryset.values(*INGREDIENT_FIELDS)
+    return list(rows if limit is None else rows[:limit])
+
+
+def get_image_url(name, request=None):
+    if not name:
+        return None
+    url = image_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def get_recipe_tags(recipe_ids):
+    tags = defaultdict(list)
+    for row in RecipeTag.objects.filter(
+            recipes_id__in=recipe_ids
+    ).order_by('-tags_id').values(
+        'recipes_id', *(f'tags__{field}' for field in TAG_FIELDS)
+    ):
+        tags[row['recipes_id']].append(tag_payload({
+            field: row[f'tags__{field}'] for field in TAG_FIELDS
+        }))
+    return tags
+
+
+def get_recipe_ingredients(recipe_ids):
+    ingredients = defaultdict(list)
+    for recipe_id, ingredient_id, name, measurement_unit, amount in (
+            Amount.objects.filter(recipes_id__in=recipe_ids).order_by(
+                '-id'
+            ).values_list(
+                'recipes_id', 'ingredients_id', 'ingredients__name',
+                'ingredients__measurement_unit', 'amount'
+            )
+    ):
+        # IngredientRecipeSerializer отдает id строкой.
+        ingredients[recipe_id].append({
+            'id': str(ingredient_id),
+            'name': name,
+            'measurement_unit': measurement_unit,
+            'amount': amount,
+        })
+    return ingredients
+
+
+def get_recipe_payloads(recipe_ids, request=None):
+    """
+    Не зависящая от пользователя часть RecipeSerializerGet для рецептов
+    recipe_ids: {id: payload}. Собирается тремя запросами values()
+    без экземпляров моделей и полей DRF.
+    """
+    recipe_ids = list(recipe_ids)
+    tags = get_recipe_tags(recipe_ids)
+    ingredients = get_recipe_ingredients(recipe_ids)
+    payloads = {}
+    for row in Recipe.objects.filter(pk__in=recipe_ids).values(
+            'id', 'image', 'image_variants', 'name', 'text', 'cooking_time',
+            *(f'author__{field}' for field in AUTHOR_FIELDS)
+    ):
+        payloads[row['id']] = {
+            'id': row['id'],
+            'tags': tags[row['id']],
+            'author': {
+                field: row[f'author__{field}'] for field in AUTHOR_FIELDS
+            },
+            'image': get_image_url(row['image'], request),
+            'image_variants': get_variant_urls(
+                row['image_variants'], request
+            ),
+            'name': row['name'],
+            'text': row['text'],
+            'cooking_time': row['cooking_time'],
+            'ingredients': ingredients[row['id']],
+        }
+    return payloads
@@ -0,0 +1,73 @@
+from django.conf import settings
+
+from .cache import LRUCache
+from .payloads import get_recipe_payloads
+from .routers import use_primary
+from .versions import (
+    get_versions, INGREDIENT_VERSION, RECIPE_VERSION, TAG_VERSION,
+    USER_VERSION
+)
+
+recipe_cache = LRUCache(settings.RECIPE_CACHE_MAX_ENTRIES)
+
+
+def get_payload_keys(recipes, request):
+    """
+    Ключи кэша для рецептов: адрес сайта (от него зависят ссылки на
+    картинки), id рецепта и версии рецепта, автора и справочников.
+    """
+    names = {TAG_VERSION, INGREDIENT_VERSION}
+    for recipe in recipes:
+        names.add(RECIPE_VERSION.format(recipe.pk))
+        names.add(USER_VERSION.format(recipe.author_id))
+    versions = get_versions(names)
+    base_url = request.build_absolute_uri('/')
+    return {
+        recipe.pk: (
+            base_url,
+            recipe.pk,
+            versions[RECIPE_VERSION.format(recipe.pk)],
+            versions[USER_VERSION.format(recipe.author_id)],
+            versions[TAG_VERSION],
+            versions[INGREDIENT_VERSION],
+        )
+        for recipe in recipes
+    }
+
+
+def get_payloads(recipes, request):
+    """Общая для всех пользователей часть рецептов: {id: payload}."""
+    keys = get_payload_keys(recipes, request)
+    cached = recipe_cache.get_many(list(keys.values()))
+    payloads = {
+        recipe_id: cached[key]
+        for recipe_id, key in keys.items() if key in cached
+    }
+    missing = [recipe_id for recipe_id in keys if recipe_id not in payloads]
+    if missing:
+        with use_primary():
+            loaded = get_recipe_payloads(missing, request)
+        for recipe_id, payload in loaded.items():
+            recipe_cache.set(keys[recipe_id], payload)
+            payloads[recipe_id] = payload
+    return payloads
+
+
+def serialize_recipes(recipes, request):
+    """
+    Рецепты в формате RecipeSerializerGet. Общая часть берется из кэша,
+    а флаги пользователя - из аннотаций is_favorited,
+    is_in_shopping_cart и author_is_subscribed.
+    """
+    payloads = get_payloads(recipes, request)
+    data = []
+    for recipe in recipes:
+        payload = payloads[recipe.pk]
+        item = dict(payload)
+        item['author'] = dict(
+            payload['author'], is_subscribed=recipe.author_is_subscribed
+        )
+        item['is_favorited'] = recipe.is_favorited
+        item['is_in_shopping_cart'] = recipe.is_in_shopping_cart
+        data.append(item)
+    return data
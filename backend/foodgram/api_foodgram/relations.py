@@ -0,0 +1,67 @@
+from django.utils.functional import cached_property
+
+from .models import Favorite, ShoppingCart, Subscriber
+
+
+class RelationSnapshot:
+    """
+    Связи текущего пользователя на время запроса: id авторов,
+    на которых он подписан, и id рецептов в избранном и в корзине.
+    Каждый набор загружается одним запросом при первом обращении.
+    """
+
+    def __init__(self, user=None):
+        if user is not None and not user.is_authenticated:
+            user = None
+        self.user = user
+
+    def load(self, queryset, field):
+        if self.user is None:
+            return frozenset()
+        # Без сортировки из Meta.ordering id читаются из составного
+        # индекса (user, ...) без обращения к таблице.
+        return frozenset(queryset.filter(
+            user=self.user
+        ).order_by().values_list(field, flat=True))
+
+    @cached_property
+    def subscribed_ids(self):
+        return self.load(Subscriber.objects, 'subscribed_id')
+
+    @cached_property
+    def favorite_ids(self):
+        return self.load(Favorite.objects, 'recipes_id')
+
+    @cached_property
+    def cart_ids(self):
+        return self.load(ShoppingCart.objects, 'recipe_id')
+
+    def is_subscribed(self, author):
+        return author.pk in self.subscribed_ids
+
+    def is_favorited(self, recipe):
+        return recipe.pk in self.favorite_ids
+
+    def is_in_shopping_cart(self, recipe):
+        return recipe.pk in self.cart_ids
+
+
+def get_relations(context):
+    """
+    Снимок связей из контекста сериализатора. Создается один раз
+    на запрос и хранится в самом запросе, поэтому общий для всех
+    сериализаторов, сколько бы контекстов ни было.
+    """
+    relations = context.get('relations')
+    if relations is not None:
+        return relations
+    request = context.get('request')
+    if request is None:
+        relations = RelationSnapshot()
+    else:
+        relations = getattr(request, 'relations', None)
+        if relations is None:
+            relations = RelationSnapshot(request.user)
+            request.relations = relations
+    context['relations'] = relations
+    return relations
@@ -0,0 +1,155 @@
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import sha256
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_KEY = 'foodgram:primary:{}'
+# Модели, которые всегда читаются с основной БД: только что выданный
+# токен может еще не дойти до реплики.
+PRIMARY_MODELS = {'authtoken.token'}
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+@contextmanager
+def use_primary():
+    """
+    Чтение с основной БД внутри блока. Нужно при заполнении кэшей
+    воркера: данные с отстающей реплики попали бы в кэш под новой
+    версией и остались бы там до следующего изменения.
+    """
+    token = read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение на одну из реплик DATABASE_REPLICAS, если
+    ReplicaMiddleware разрешила это для текущего запроса. Запись,
+    миграции и остальные запросы идут в основную БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.DATABASE_REPLICAS and read_from_replica.get()
+            and model._meta.label_lower not in PRIMARY_MODELS
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def get_client_key(request):
+    """
+    Ключ клиента для привязки к основной БД - по токену. Анонимные
+    клиенты не привязываются: адрес общий у клиентов за NAT и прокси,
+    а после регистрации и входа запросы идут уже с токеном.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return STICKY_KEY.format(sha256(authorization.encode()).hexdigest())
+
+
+def is_sticky(request):
+    """Читает ли клиент с основной БД после своего изменения."""
+    key = get_client_key(request)
+    return key is not None and bool(cache.get(key))
+
+
+def stick(request):
+    key = get_client_key(request)
+    if key is not None:
+        cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """
+    Читает с реплик при безопасных запросах к view, у которых
+    read_replica = True. После любого изменяющего запроса клиент
+    с токеном REPLICA_STICKY_SECONDS секунд читает с основной БД,
+    чтобы видеть свои изменения, пока реплики их догоняют.
+
+    Под ASGI работает асинхронно, включая process_view: синхронные
+    методы Django выполнял бы в одном общем потоке, и асинхронные
+    view обслуживались бы по одной.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if asyncio.iscoroutinefunction(get_response):
+            self.process_view = self.process_view_async
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+        if self.must_stick(request, response):
+            stick(request)
+        return response
+
+    async def __acall__(self, request):
+        token = read_from_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+        if self.must_stick(request, response):
+            await sync_to_async(stick, thread_sensitive=False)(request)
+        return response
+
+    @staticmethod
+    def must_stick(request, response):
+        return (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
+
+    @staticmethod
+    def can_read_replica(request, view_func):
+        view_class = getattr(view_func, 'cls', None)
+        return (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and getattr(view_class, 'read_replica', False)
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.can_read_replica(request, view_func):
+            return
+        if not is_sticky(request):
+            read_from_replica.set(True)
+
+    async def process_view_async(
+            self, request, view_func, view_args, view_kwargs
+    ):
+        if not self.can_read_replica(request, view_func):
+            return
+        sticky = await sync_to_async(is_sticky, thread_sensitive=False)(
+            request
+        )
+        if not sticky:
+            read_from_replica.set(True)
@@ -0,0 +1,122 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Case, FloatField, When
+from django.db.models.expressions import RawSQL
+
+from .models import Amount, Ingredient, Recipe
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'api_foodgram_recipe_fts'
+
+RECIPE_TABLE = Recipe._meta.db_table
+AMOUNT_TABLE = Amount._meta.db_table
+INGREDIENT_TABLE = Ingredient._meta.db_table
+
+INGREDIENT_NAMES_SQL = (
+    f'SELECT {{aggregate}} FROM {AMOUNT_TABLE} '
+    f'JOIN {INGREDIENT_TABLE} '
+    f'ON {INGREDIENT_TABLE}.id = {AMOUNT_TABLE}.ingredients_id '
+    f'WHERE {AMOUNT_TABLE}.recipes_id = {RECIPE_TABLE}.id'
+)
+POSTGRES_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+    f"coalesce({RECIPE_TABLE}.name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(("
+    + INGREDIENT_NAMES_SQL.format(
+        aggregate=f"string_agg({INGREDIENT_TABLE}.name, ' ')"
+    )
+    + f"), '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+    f"coalesce({RECIPE_TABLE}.text, '')), 'C')"
+)
+SQLITE_ROWS_SQL = (
+    f'SELECT {RECIPE_TABLE}.id, {RECIPE_TABLE}.name, ('
+    + INGREDIENT_NAMES_SQL.format(
+        aggregate=f"group_concat({INGREDIENT_TABLE}.name, ' ')"
+    )
+    + f"), {RECIPE_TABLE}.text FROM {RECIPE_TABLE}"
+)
+
+
+def update_search_index(recipe_ids=None):
+    """
+    Пересчитывает поисковый индекс рецептов recipe_ids
+    (всех рецептов, если recipe_ids не передан).
+    """
+    if recipe_ids is not None:
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            sql = f'UPDATE {RECIPE_TABLE} SET search_vector = ' \
+                  f'{POSTGRES_VECTOR_SQL}'
+            params = []
+            if recipe_ids is not None:
+                sql += f' WHERE {RECIPE_TABLE}.id = ANY(%s)'
+                params.append(recipe_ids)
+            cursor.execute(sql, params)
+        elif connection.vendor == 'sqlite':
+            delete_sql = f'DELETE FROM {FTS_TABLE}'
+            insert_sql = (
+                f'INSERT INTO {FTS_TABLE}(rowid, name, ingredients, text) '
+                f'{SQLITE_ROWS_SQL}'
+            )
+            params = []
+            if recipe_ids is not None:
+                placeholders = ', '.join(['%s'] * len(recipe_ids))
+                delete_sql += f' WHERE rowid IN ({placeholders})'
+                insert_sql += f' WHERE {RECIPE_TABLE}.id IN ({placeholders})'
+                params = recipe_ids
+            cursor.execute(delete_sql, params)
+            cursor.execute(insert_sql, params)
+
+
+def delete_from_search_index(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if connection.vendor != 'sqlite' or not recipe_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+            recipe_ids
+        )
+
+
+def search_recipes(queryset, query):
+    """
+    Рецепты, подходящие под поисковый запрос, по убыванию релевантности.
+    """
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(RawSQL(
+            f'{RECIPE_TABLE}.search_vector @@ {tsquery}',
+            (query,), output_field=BooleanField()
+        )).annotate(search_rank=RawSQL(
+            f'ts_rank({RECIPE_TABLE}.search_vector, {tsquery})',
+            (query,), output_field=FloatField()
+        )).order_by('-search_rank', '-id')
+    words = re.findall(r'\w+', query)
+    if not words:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        for word in words:
+            queryset = queryset.filter(name__icontains=word)
+        return queryset
+    # В FTS5 нет русского стеммера, поэтому каждое слово ищется как префикс.
+    match = ' '.join(f'"{word}"*' for word in words)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, 10.0, 4.0, 1.0)',
+            [match]
+        )
+        recipe_ids = [row[0] for row in cursor.fetchall()]
+    if not recipe_ids:
+        return queryset.none()
+    return queryset.filter(pk__in=recipe_ids).order_by(Case(
+        *[When(pk=pk, then=position)
+          for position, pk in enumerate(recipe_ids)]
+    ))
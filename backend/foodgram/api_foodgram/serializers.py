@@ -1,12 +1,22 @@
+import json
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework.generics import get_object_or_404
+from rest_framework.utils import html
 
 from .models import (
     User, Subscriber, Tag, Ingredient,
-    Recipe, Amount,
+    Recipe, Amount, RecipeTag,
     Favorite, ShoppingCart
 )
+from . import shopping_list
+from .fields import StreamingBase64ImageField
+from .images import get_variant_urls
+from .relations import get_relations
 
 
 class NewUserSerializer(serializers.ModelSerializer):
@@ -52,12 +62,9 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, following):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Subscriber.objects.filter(
-            user=request.user, subscribed=following
-        ).exists()
+        if hasattr(following, 'is_subscribed'):
+            return following.is_subscribed
+        return get_relations(self.context).is_subscribed(following)
 
 
 class PasswordSerializer(serializers.ModelSerializer):
@@ -133,14 +140,26 @@ class AmountForCreateRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'amount')
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Ссылки на уменьшенные копии картинки:
+    {'card': {'webp': url, 'jpeg': url}, 'thumbnail': {...}}.
+    Пока копии не созданы, возвращается пустой словарь.
+    """
+
+    def to_representation(self, value):
+        return get_variant_urls(value, self.context.get('request'))
+
+
 class FavoriteRecipeSerializer(serializers.ModelSerializer):
     """
     Сериализатор для избранного.
     """
     image = Base64ImageField(required=False)
+    image_variants = ImageVariantsField()
 
     class Meta:
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
         model = Recipe
 
     def validate(self, data):
@@ -201,10 +220,11 @@ class LiteRecipeSerializer(serializers.ModelSerializer):
     Сокращенный сериализатор рецепта.
     """
     image = Base64ImageField(required=False)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
@@ -248,10 +268,16 @@ class FollowListSerializer(serializers.ModelSerializer):
         )
 
     def get_recipes_count(self, following):
-        return Recipe.objects.filter(author=following).count()
+        return following.recipes_count
 
     def get_recipes(self, following):
         queryset = self.context.get('request')
+        recipes_by_author = self.context.get('recipes_by_author')
+        if recipes_by_author is not None:
+            return RecipeFollowingSerializer(
+                recipes_by_author.get(following.pk, []),
+                many=True, context={'request': queryset}
+            ).data
         recipes_limit = queryset.query_params.get('recipes_limit')
         if not recipes_limit:
             return RecipeFollowingSerializer(
@@ -264,18 +290,18 @@ class FollowListSerializer(serializers.ModelSerializer):
         ).data
 
     def get_is_subscribed(self, following):
-        return Subscriber.objects.filter(
-            user=self.context.get('request').user,
-            subscribed=following
-        ).exists()
+        if hasattr(following, 'is_subscribed'):
+            return following.is_subscribed
+        return get_relations(self.context).is_subscribed(following)
 
 
 class RecipeFollowingSerializer(serializers.ModelSerializer):
     """ Сериализация списка рецептов на кого подписан пользователь """
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -327,30 +353,25 @@ class RecipeSerializerGet(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
     image = Base64ImageField(required=False)
+    image_variants = ImageVariantsField()
 
     class Meta:
         fields = (
-            'id', 'tags', 'author', 'image', 'name', 'text',
-            'cooking_time', 'ingredients', 'is_favorited',
+            'id', 'tags', 'author', 'image', 'image_variants', 'name',
+            'text', 'cooking_time', 'ingredients', 'is_favorited',
             'is_in_shopping_cart'
         )
         model = Recipe
 
     def get_is_favorited(self, recipes):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Favorite.objects.filter(
-            user=request.user, recipes=recipes
-        ).exists()
+        if hasattr(recipes, 'is_favorited'):
+            return recipes.is_favorited
+        return get_relations(self.context).is_favorited(recipes)
 
     def get_is_in_shopping_cart(self, recipes):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return ShoppingCart.objects.filter(
-            user=request.user, recipe=recipes
-        ).exists()
+        if hasattr(recipes, 'is_in_shopping_cart'):
+            return recipes.is_in_shopping_cart
+        return get_relations(self.context).is_in_shopping_cart(recipes)
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
@@ -360,7 +381,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
     ingredients = IngredientRecipeSerializer(
         many=True, source="amount"
     )
-    image = Base64ImageField()
+    image = StreamingBase64ImageField()
 
     class Meta:
         model = Recipe
@@ -373,57 +394,138 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             "cooking_time",
         )
 
+    def to_internal_value(self, data):
+        if html.is_html_input(data):
+            data = self.parse_form_data(data)
+        return super().to_internal_value(data)
+
+    @staticmethod
+    def parse_form_data(data):
+        """
+        Рецепт из multipart/form-data: картинка передается файлом,
+        а теги и ингредиенты - строкой JSON. Теги можно передать
+        и повторяющимся полем: tags=1&tags=2.
+        """
+        parsed = data.dict()
+        for key in ("tags", "ingredients"):
+            values = data.getlist(key)
+            if len(values) == 1 and str(values[0]).lstrip().startswith("["):
+                try:
+                    parsed[key] = json.loads(values[0])
+                except ValueError:
+                    raise serializers.ValidationError({key: "Неверный JSON."})
+            elif values:
+                parsed[key] = values
+        return parsed
+
+    @staticmethod
+    def parse_ingredients(data):
+        """Состав рецепта из validated_data: {ingredient_id: amount}."""
+        return {
+            int(item["ingredients"]["id"]): item["amount"] for item in data
+        }
+
     @staticmethod
-    def parse_ingredients(recipe, data):
-        for ingredient_data in data:
-            try:
-                ingredient_current = Ingredient.objects.get(
-                    pk=ingredient_data["ingredients"]["id"]
-                )
-            except serializers.ValidationError:
-                raise serializers.ValidationError("Miss ingredient")
-            Amount.objects.create(
-                recipes=recipe,
-                amount=ingredient_data["amount"],
-                ingredients=ingredient_current,
+    def set_ingredients(recipe, amounts):
+        """
+        Приводит состав рецепта к amounts: добавляет, меняет и удаляет
+        только отличающиеся строки Amount. Возвращает прежний состав
+        оставшихся строк: удаленные вычитает из списков покупок сигнал.
+        """
+        existing = {
+            amount.ingredients_id: amount
+            for amount in Amount.objects.filter(recipes=recipe)
+        }
+        old_amounts = Counter({
+            ingredient_id: row.amount
+            for ingredient_id, row in existing.items()
+            if ingredient_id in amounts
+        })
+        to_update = []
+        for ingredient_id, amount in amounts.items():
+            row = existing.get(ingredient_id)
+            if row is not None and row.amount != amount:
+                row.amount = amount
+                to_update.append(row)
+        Amount.objects.filter(pk__in=[
+            row.pk for ingredient_id, row in existing.items()
+            if ingredient_id not in amounts
+        ]).delete()
+        Amount.objects.bulk_update(to_update, ['amount'])
+        Amount.objects.bulk_create([
+            Amount(
+                recipes=recipe, ingredients_id=ingredient_id, amount=amount
             )
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in existing
+        ])
+        return old_amounts
 
+    @staticmethod
+    def set_tags(recipe, tags):
+        """Приводит теги рецепта к tags, меняя только отличающиеся."""
+        tag_ids = {tag.pk for tag in tags}
+        existing = set(RecipeTag.objects.filter(
+            recipes=recipe
+        ).values_list('tags_id', flat=True))
+        RecipeTag.objects.filter(
+            recipes=recipe, tags_id__in=existing - tag_ids
+        ).delete()
+        RecipeTag.objects.bulk_create([
+            RecipeTag(recipes=recipe, tags_id=tag_id)
+            for tag_id in tag_ids - existing
+        ])
+
+    @transaction.atomic
     def create(self, validated_data):
-        if "tags" in validated_data:
-            tags = validated_data.pop("tags")
-        ingredients_data = validated_data.pop("amount")
+        tags = validated_data.pop("tags")
+        amounts = self.parse_ingredients(validated_data.pop("amount"))
         recipe = super().create(validated_data)
-        recipe.tags.add(*tags)
-        self.parse_ingredients(recipe, ingredients_data)
+        self.set_tags(recipe, tags)
+        self.set_ingredients(recipe, amounts)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if "tags" in validated_data:
-            tags = validated_data.pop("tags")
-            instance.tags.clear()
-            instance.tags.add(*tags)
-        ingredients_data = validated_data.pop("amount")
-        Amount.objects.filter(recipes=instance).delete()
-        self.parse_ingredients(instance, ingredients_data)
+            self.set_tags(instance, validated_data.pop("tags"))
+        if "amount" in validated_data:
+            old_amounts = self.set_ingredients(
+                instance, self.parse_ingredients(validated_data.pop("amount"))
+            )
+            shopping_list.change_recipe(instance, old_amounts)
         validated_data['author'] = instance.author
-        print(validated_data)
-        recipe = super().update(instance, validated_data)
-        return recipe
+        return super().update(instance, validated_data)
+
+    def to_representation(self, instance):
+        prefetch_related_objects([instance], Prefetch(
+            'amount', queryset=Amount.objects.select_related('ingredients')
+        ))
+        return super().to_representation(instance)
 
     def validate(self, data):
-        ingredients = []
-        for ingredient in data['amount']:
-            if ingredient['ingredients']['id'] not in ingredients:
-                ingredients.append(ingredient['ingredients']['id'])
-            else:
-                raise serializers.ValidationError(
-                    'Ингредиенты не должны повторяться!')
-        tags = []
-        for tag in data["tags"]:
-            if tag not in tags:
-                tags.append(tag)
-            else:
-                raise serializers.ValidationError(
-                    "Тэги не должны повторяться!"
-                )
+        ingredients = data.get('amount', [])
+        try:
+            ingredient_ids = {
+                int(ingredient['ingredients']['id'])
+                for ingredient in ingredients
+            }
+        except (TypeError, ValueError):
+            raise serializers.ValidationError('Неверный id ингредиента!')
+        if len(ingredient_ids) != len(ingredients):
+            raise serializers.ValidationError(
+                'Ингредиенты не должны повторяться!')
+        found = set(Ingredient.objects.filter(
+            pk__in=ingredient_ids
+        ).values_list('pk', flat=True))
+        if found != ingredient_ids:
+            raise serializers.ValidationError(
+                f'Ингредиенты не найдены: '
+                f'{sorted(ingredient_ids - found)}'
+            )
+        tags = data.get('tags', [])
+        if len(set(tags)) != len(tags):
+            raise serializers.ValidationError(
+                "Тэги не должны повторяться!"
+            )
         return data
@@ -0,0 +1,123 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Amount, ShoppingCart, ShoppingListItem, User
+
+
+def get_recipe_amounts(recipe):
+    """Количество каждого ингредиента в рецепте: {ingredient_id: amount}."""
+    amounts = Counter()
+    for ingredient_id, amount in Amount.objects.filter(
+            recipes=recipe
+    ).values_list('ingredients_id', 'amount'):
+        amounts[ingredient_id] += amount
+    return amounts
+
+
+def apply_deltas(user_ids, deltas):
+    """
+    Прибавляет deltas ({ingredient_id: delta}) к спискам покупок
+    пользователей. Позиции с нулевым итогом удаляются.
+    """
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not deltas:
+        return
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    with transaction.atomic():
+        # Блокируем пользователей, чтобы параллельные изменения одного
+        # списка покупок применялись по очереди.
+        list(User.objects.select_for_update().filter(
+            pk__in=user_ids
+        ).order_by('pk').values_list('pk', flat=True))
+        items = {
+            (item.user_id, item.ingredient_id): item
+            for item in ShoppingListItem.objects.filter(
+                user_id__in=user_ids, ingredient_id__in=deltas
+            )
+        }
+        to_create, to_update, to_delete = [], [], []
+        for user_id in user_ids:
+            for ingredient_id, delta in deltas.items():
+                item = items.get((user_id, ingredient_id))
+                if item is None:
+                    if delta > 0:
+                        to_create.append(ShoppingListItem(
+                            user_id=user_id,
+                            ingredient_id=ingredient_id,
+                            total=delta
+                        ))
+                    continue
+                item.total += delta
+                if item.total > 0:
+                    to_update.append(item)
+                else:
+                    to_delete.append(item.pk)
+        ShoppingListItem.objects.bulk_create(to_create)
+        ShoppingListItem.objects.bulk_update(to_update, ['total'])
+        ShoppingListItem.objects.filter(pk__in=to_delete).delete()
+
+
+def add_recipe(user_id, recipe_id):
+    apply_deltas([user_id], get_recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_id, recipe_id):
+    amounts = get_recipe_amounts(recipe_id)
+    apply_deltas([user_id], {key: -value for key, value in amounts.items()})
+
+
+def change_amounts(recipe_id, deltas):
+    """Прибавляет deltas ко всем спискам покупок с рецептом recipe_id."""
+    apply_deltas(
+        ShoppingCart.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('user_id', flat=True),
+        deltas
+    )
+
+
+def change_recipe(recipe, old_amounts):
+    """
+    Переносит изменение состава рецепта во все списки покупок,
+    в которых он лежит. old_amounts - состав до изменения.
+    """
+    deltas = get_recipe_amounts(recipe)
+    deltas.subtract(old_amounts)
+    change_amounts(recipe.pk, deltas)
+
+
+def calculate_totals(user_ids=None):
+    """Пересчитывает списки покупок по корзине: {user_id: {id: total}}."""
+    amounts = Amount.objects.filter(recipes__shopping__isnull=False)
+    if user_ids is not None:
+        amounts = amounts.filter(recipes__shopping__user__in=user_ids)
+    totals = defaultdict(dict)
+    for user_id, ingredient_id, total in amounts.values_list(
+            'recipes__shopping__user', 'ingredients'
+    ).annotate(total=Sum('amount')).order_by():
+        totals[user_id][ingredient_id] = total
+    return totals
+
+
+def rebuild(user_ids=None):
+    """Полностью перестраивает списки покупок из корзины."""
+    totals = calculate_totals(user_ids)
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    with transaction.atomic():
+        items.delete()
+        ShoppingListItem.objects.bulk_create(
+            [
+                ShoppingListItem(
+                    user_id=user_id, ingredient_id=ingredient_id, total=total
+                )
+                for user_id, ingredients in totals.items()
+                for ingredient_id, total in ingredients.items()
+            ],
+            batch_size=1000
+        )
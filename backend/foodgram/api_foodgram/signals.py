@@ -0,0 +1,207 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_save
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import shopping_list
+from .counters import change_favorites_count, change_recipes_count
+from .images import (
+    delete_unused_image, get_variant_names, schedule_variants
+)
+from .models import (
+    Amount, Favorite, Ingredient, Recipe, ShoppingCart, Tag, User
+)
+from .search import delete_from_search_index, update_search_index
+from .versions import (
+    AUTH_VERSION, bump_version, INGREDIENT_VERSION, RECIPE_VERSION,
+    TAG_VERSION, USER_VERSION
+)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_version(INGREDIENT_VERSION)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version(TAG_VERSION)
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_renamed(sender, instance, created, raw, **kwargs):
+    if created or raw:
+        return
+    recipe_ids = list(Amount.objects.filter(
+        ingredients=instance
+    ).values_list('recipes_id', flat=True).distinct())
+    transaction.on_commit(lambda: update_search_index(recipe_ids))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: update_search_index([instance.pk]))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    if not instance.image:
+        # Копии прежней картинки удаляет recipe_image_replaced.
+        if instance.image_variants:
+            instance.image_variants = {}
+            Recipe.objects.filter(pk=instance.pk).update(image_variants={})
+        return
+    if instance.image_variants != get_variant_names(instance.image.name):
+        schedule_variants(instance.pk)
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_image_replacing(sender, instance, raw, update_fields, **kwargs):
+    if raw or instance._state.adding or (
+            update_fields is not None and 'image' not in update_fields
+    ):
+        return
+    instance._previous_image = Recipe.objects.filter(
+        pk=instance.pk
+    ).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_replaced(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_image', None)
+    if previous and previous != instance.image.name:
+        transaction.on_commit(lambda: delete_unused_image(previous))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_image_released(sender, instance, **kwargs):
+    name = instance.image.name
+    if name:
+        transaction.on_commit(lambda: delete_unused_image(name))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_from_search_index([instance.pk]))
+
+
+@receiver(post_save, sender=Amount)
+@receiver(post_delete, sender=Amount)
+def amount_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    recipe_id = instance.recipes_id
+    transaction.on_commit(lambda: update_search_index([recipe_id]))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        change_recipes_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_removed(sender, instance, **kwargs):
+    change_recipes_count(instance.author_id, -1)
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_created(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        change_favorites_count(instance.recipes_id, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_removed(sender, instance, **kwargs):
+    change_favorites_count(instance.recipes_id, -1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def cart_recipe_added(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        shopping_list.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def cart_recipe_removed(sender, instance, **kwargs):
+    # При каскадном удалении рецепта строки корзины и состава удаляются
+    # в любом порядке: вычитаются только строки состава, которые еще
+    # есть в БД, остальные уже вычел amount_removed.
+    shopping_list.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_save, sender=Amount)
+def amount_replacing(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._previous_amount = Amount.objects.filter(
+        pk=instance.pk
+    ).values_list('recipes_id', 'ingredients_id', 'amount').first()
+
+
+@receiver(post_save, sender=Amount)
+def amount_saved(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    deltas = defaultdict(Counter)
+    deltas[instance.recipes_id][instance.ingredients_id] += instance.amount
+    previous = getattr(instance, '_previous_amount', None)
+    if previous is not None:
+        recipe_id, ingredient_id, amount = previous
+        deltas[recipe_id][ingredient_id] -= amount
+    for recipe_id, changes in deltas.items():
+        shopping_list.change_amounts(recipe_id, changes)
+
+
+@receiver(post_delete, sender=Amount)
+def amount_removed(sender, instance, **kwargs):
+    # Корзины, удаляемые вместе с рецептом, но еще не удаленные,
+    # вычтут остаток состава в cart_recipe_removed.
+    shopping_list.change_amounts(
+        instance.recipes_id, {instance.ingredients_id: -instance.amount}
+    )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Amount)
+@receiver(post_delete, sender=Amount)
+def recipe_payload_changed(sender, instance, **kwargs):
+    recipe_id = instance.pk if sender is Recipe else instance.recipes_id
+    bump_version(RECIPE_VERSION.format(recipe_id))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Recipe):
+        bump_version(RECIPE_VERSION.format(instance.pk))
+    else:
+        bump_version(TAG_VERSION)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and set(update_fields) <= {
+        'last_login', 'recipes_count'
+    }:
+        return
+    bump_version(USER_VERSION.format(instance.pk))
+    # Смена пароля, деактивация и любые правки профиля сбрасывают
+    # закэшированную аутентификацию пользователя.
+    bump_version(AUTH_VERSION.format(instance.pk))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    bump_version(AUTH_VERSION.format(instance.user_id))
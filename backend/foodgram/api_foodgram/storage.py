@@ -0,0 +1,72 @@
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.utils.deconstruct import deconstructible
+
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+
+
+def get_shard(name):
+    """Вложенные каталоги для имени: abcdef... -> ab/cd."""
+    return f'{name[:2]}/{name[2:4]}'
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME.search(name or ''))
+
+
+def lock_name(name):
+    """
+    Блокирует имя файла до конца текущей транзакции
+    (pg_advisory_xact_lock, только в PostgreSQL). Сохранение файла
+    и удаление неиспользуемого файла с тем же именем выполняются
+    по очереди: удаление дождется фиксации рецепта, который
+    ссылается на уже существующий файл, и увидит ссылку.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    key = int.from_bytes(
+        hashlib.sha256(name.encode()).digest()[:8], 'big', signed=True
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, в котором имя файла - sha256 содержимого:
+    recipes/ab/cd/abcd...ef.png.
+
+    Одинаковые файлы хранятся один раз, а содержимое файла по ссылке
+    никогда не меняется, поэтому nginx отдает их с долгим кэшем.
+    Файл удаляется, когда на него не ссылается ни один рецепт
+    (см. images.delete_unused_image).
+    """
+
+    def get_hashed_name(self, name, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        digest = sha256.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        hashed = f'{get_shard(digest)}/{digest}{extension}'
+        return f'{directory}/{hashed}' if directory else hashed
+
+    def _save(self, name, content):
+        name = self.get_hashed_name(name, content)
+        # Проверка существования - под блокировкой: иначе файл могут
+        # удалить как неиспользуемый до того, как рецепт со ссылкой
+        # на него будет сохранен.
+        lock_name(name)
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+recipe_image_storage = ContentAddressedStorage()
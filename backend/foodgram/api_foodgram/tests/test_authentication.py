@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings, TestCase
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from api_foodgram.authentication import (
+    CachedTokenAuthentication, token_cache
+)
+from api_foodgram.tests.utils import create_user, get_client
+from api_foodgram.versions import AUTH_VERSION, bump_version
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    """Кэш токенов воркера сбрасывается при смене версии пользователя."""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.entries.clear()
+        self.user = create_user(1)
+        self.token = Token.objects.create(user=self.user)
+
+    def authenticate(self):
+        return CachedTokenAuthentication().authenticate_credentials(
+            self.token.key
+        )
+
+    def assertCached(self):
+        with self.assertNumQueries(0):
+            return self.authenticate()
+
+    def assertNotCached(self):
+        with self.assertNumQueries(2):
+            return self.authenticate()
+
+    def test_cached(self):
+        self.assertNotCached()
+        user, token = self.assertCached()
+        self.assertEqual((user.pk, token.key), (self.user.pk, self.token.key))
+
+    def test_logout(self):
+        self.authenticate()
+        client = get_client(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
+
+    def test_password_change(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('NewPassw0rd!!')
+            self.user.save()
+        user, _ = self.assertNotCached()
+        self.assertTrue(user.check_password('NewPassw0rd!!'))
+
+    def test_deactivation(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_change_during_lookup(self):
+        """Изменение, зафиксированное во время загрузки из БД."""
+        load = TokenAuthentication.authenticate_credentials
+
+        def load_then_commit_logout(authentication, key):
+            loaded = load(authentication, key)
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_version(AUTH_VERSION.format(self.user.pk))
+            return loaded
+
+        with mock.patch.object(
+                TokenAuthentication, 'authenticate_credentials',
+                load_then_commit_logout
+        ):
+            self.authenticate()
+        self.assertNotCached()
+
+
+@override_settings(TOKEN_CACHE_SHARED=True)
+class SharedCachedTokenAuthenticationTest(CachedTokenAuthenticationTest):
+    """То же для общего кэша: записи берутся из него, а не из воркера."""
+
+    def authenticate(self):
+        token_cache.entries.clear()
+        return super().authenticate()
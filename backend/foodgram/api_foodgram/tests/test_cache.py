@@ -0,0 +1,69 @@
+import gzip
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api_foodgram.cache import GZIP_MIN_LENGTH, RenderedEntry
+from api_foodgram.tests.utils import create_ingredient, get_client
+
+
+class RenderedEntryTest(TestCase):
+
+    def test_gzip_body(self):
+        body = b'{"name": "mango"}' * 100
+        entry = RenderedEntry('1', body)
+        self.assertEqual(gzip.decompress(entry.gzip_body), body)
+        self.assertNotEqual(entry.gzip_etag, entry.etag)
+        # Без времени в заголовке байты одинаковы в любом воркере.
+        self.assertEqual(RenderedEntry('2', body).gzip_body, entry.gzip_body)
+
+    def test_small_body_not_compressed(self):
+        entry = RenderedEntry('1', b'[]')
+        self.assertIsNone(entry.gzip_body)
+        self.assertIsNone(entry.gzip_etag)
+
+
+class CachedListTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(50):
+            create_ingredient(f'ингредиент {number}')
+
+    def setUp(self):
+        # Версии в кэше не меняются при откате данных других тестов.
+        cache.clear()
+        self.client = get_client()
+
+    def test_gzip_response(self):
+        plain = self.client.get('/api/ingredients/')
+        self.assertGreaterEqual(len(plain.content), GZIP_MIN_LENGTH)
+        self.assertNotIn('Content-Encoding', plain)
+        response = self.client.get(
+            '/api/ingredients/', HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertNotEqual(response['ETag'], plain['ETag'])
+
+    def test_not_modified(self):
+        for headers in ({}, {'HTTP_ACCEPT_ENCODING': 'gzip'}):
+            with self.subTest(**headers):
+                etag = self.client.get('/api/ingredients/', **headers)['ETag']
+                response = self.client.get(
+                    '/api/ingredients/', HTTP_IF_NONE_MATCH=etag, **headers
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_changed_list_gets_new_etag(self):
+        etag = self.client.get('/api/ingredients/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            create_ingredient('новый')
+        response = self.client.get(
+            '/api/ingredients/', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
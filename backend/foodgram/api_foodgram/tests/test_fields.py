@@ -0,0 +1,70 @@
+import base64
+import tracemalloc
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+
+from api_foodgram.fields import StreamingBase64ImageField
+from api_foodgram.tests.utils import make_image
+
+
+def as_base64(content, content_type):
+    encoded = base64.b64encode(content).decode()
+    return f'data:{content_type};base64,{encoded}'
+
+
+class StreamingBase64ImageFieldTest(SimpleTestCase):
+
+    def setUp(self):
+        self.field = StreamingBase64ImageField()
+
+    def assertInvalidType(self, data):
+        with self.assertRaises(ValidationError) as context:
+            self.field.to_internal_value(data)
+        self.assertEqual(
+            context.exception.detail[0].code, 'invalid_type'
+        )
+
+    def test_allowed_types(self):
+        for image_format, content_type in (
+                ('PNG', 'image/png'), ('JPEG', 'image/jpeg'),
+                ('GIF', 'image/gif')
+        ):
+            content = make_image(image_format)
+            with self.subTest(image_format=image_format):
+                file = self.field.to_internal_value(
+                    as_base64(content, content_type)
+                )
+                self.assertEqual(file.image.format, image_format)
+                file = self.field.to_internal_value(SimpleUploadedFile(
+                    f'image.{image_format.lower()}', content, content_type
+                ))
+                self.assertEqual(file.image.format, image_format)
+
+    def test_base64_type_whitelist(self):
+        self.assertInvalidType(as_base64(make_image('BMP'), 'image/bmp'))
+
+    def test_multipart_type_whitelist(self):
+        self.assertInvalidType(SimpleUploadedFile(
+            'image.bmp', make_image('BMP'), 'image/bmp'
+        ))
+        # Расширение и content_type не помогают обойти проверку.
+        self.assertInvalidType(SimpleUploadedFile(
+            'image.png', make_image('TIFF'), 'image/png'
+        ))
+
+    def test_large_upload_peak_memory(self):
+        content = make_image('PNG', size=(1500, 1200), noise=True)
+        data = as_base64(content, 'image/png')
+        self.assertGreater(len(content), 5 * 1024 * 1024)
+        tracemalloc.start()
+        try:
+            file = self.field.to_internal_value(data)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(file.size, len(content))
+        # Картинка декодируется частями во временный файл и не
+        # копируется в память целиком.
+        self.assertLess(peak, 1024 * 1024)
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from api_foodgram.tests.utils import (
+    create_recipe, create_tag, create_user, get_client
+)
+
+
+class TagSlugFilterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user(1)
+        breakfast, lunch, dinner = (
+            create_tag(slug) for slug in ('breakfast', 'lunch', 'dinner')
+        )
+        cls.both = create_recipe(author, 'Омлет', [breakfast, lunch])
+        cls.lunch = create_recipe(author, 'Суп', [lunch])
+        cls.dinner = create_recipe(author, 'Рагу', [dinner])
+        cls.untagged = create_recipe(author, 'Чай')
+
+    def setUp(self):
+        # Версии тегов - в кэше, а теги других тестов откатываются
+        # без смены версии: карта slug -> id строится заново.
+        cache.clear()
+        self.client = get_client()
+
+    def get_ids(self, *slugs):
+        response = self.client.get(
+            '/api/recipes/', {'tags': slugs, 'limit': 10}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_one_slug(self):
+        self.assertEqual(
+            self.get_ids('breakfast'), [self.both.pk]
+        )
+
+    def test_several_slugs(self):
+        ids = self.get_ids('breakfast', 'lunch')
+        self.assertEqual(ids, [self.lunch.pk, self.both.pk])
+        response = self.client.get(
+            '/api/recipes/', {'tags': ['breakfast', 'lunch']}
+        )
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_unknown_slug(self):
+        response = self.client.get(
+            '/api/recipes/', {'tags': ['lunch', 'unknown']}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tags', response.json())
+
+    def test_tag_created_after_map_cached(self):
+        self.assertEqual(self.get_ids('dinner'), [self.dinner.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.untagged.tags.add(create_tag('snack'))
+        self.assertEqual(self.get_ids('snack'), [self.untagged.pk])
+        self.assertEqual(
+            self.get_ids('snack', 'dinner'),
+            [self.untagged.pk, self.dinner.pk]
+        )
@@ -0,0 +1,74 @@
+import json
+
+from django.test import TestCase
+
+from api_foodgram.importers import RecipeImporter
+from api_foodgram.models import Recipe
+
+from .utils import create_ingredient, create_tag, create_user, get_client
+
+
+class RecipeImporterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user(1)
+        cls.admin.is_staff = True
+        cls.admin.save()
+        cls.tag = create_tag('breakfast')
+        cls.salt = create_ingredient('соль')
+
+    def make_line(self, **fields):
+        data = {
+            'name': 'Каша', 'text': 'Сварить', 'cooking_time': 10,
+            'tags': ['breakfast'],
+            'ingredients': [{'id': self.salt.pk, 'amount': 5}],
+        }
+        data.update(fields)
+        return json.dumps(data, ensure_ascii=False)
+
+    def test_wrong_field_types_are_line_errors(self):
+        lines = [
+            self.make_line(tags=5),
+            self.make_line(tags=[['breakfast']]),
+            self.make_line(ingredients=7),
+            self.make_line(ingredients=[{'id': [1], 'amount': 5}]),
+            self.make_line(ingredients=[{'name': ['соль'], 'amount': 5}]),
+            self.make_line(author=[1]),
+            self.make_line(author=True),
+            self.make_line(image=5),
+            self.make_line(),
+        ]
+        importer = RecipeImporter(self.admin).run(lines)
+        self.assertEqual(importer.created, 1)
+        self.assertEqual(
+            [line_number for line_number, error in importer.errors],
+            list(range(1, 9))
+        )
+
+    def test_invalid_utf8_is_line_error(self):
+        lines = [
+            b'\xff\xfe not utf-8\n',
+            self.make_line().encode(),
+        ]
+        importer = RecipeImporter(self.admin).run(lines)
+        self.assertEqual(importer.created, 1)
+        self.assertEqual(len(importer.errors), 1)
+        self.assertEqual(importer.errors[0][0], 1)
+
+    def test_import_endpoint_reports_errors(self):
+        body = b'\n'.join([
+            self.make_line(tags=5).encode(),
+            b'\xff',
+            self.make_line(name='Омлет').encode(),
+        ])
+        response = get_client(self.admin).post(
+            '/api/recipes/import/', body,
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(
+            [error['line'] for error in response.json()['errors']], [1, 2]
+        )
+        self.assertTrue(Recipe.objects.filter(name='Омлет').exists())
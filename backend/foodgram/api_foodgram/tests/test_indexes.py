@@ -0,0 +1,136 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.test import TransactionTestCase
+
+from api_foodgram.models import (
+    Amount, Favorite, Ingredient, Recipe, RecipeTag, ShoppingCart,
+    Subscriber, Tag, User
+)
+
+USERS = 50
+RECIPES = 200
+PER_USER = 40
+
+
+@skipUnless(
+    connection.vendor == 'postgresql', 'Планы запросов только PostgreSQL.'
+)
+class RelationIndexesTest(TransactionTestCase):
+    """
+    Частые запросы к таблицам связей идут по составным индексам.
+    Запросы без сортировки, как в приложении: сортировка по id
+    из Meta.ordering не дает планировщику читать только индекс.
+    """
+
+    def setUp(self):
+        users = User.objects.bulk_create([
+            User(
+                email=f'user{number}@foodgram.ru', username=f'user{number}',
+                first_name='Имя', last_name='Фамилия'
+            )
+            for number in range(USERS)
+        ])
+        tags = Tag.objects.bulk_create([
+            Tag(name=f'тег {number}', color='#E26C2D', slug=f'tag{number}')
+            for number in range(10)
+        ])
+        ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(100)
+        ])
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author=users[number % USERS], name=f'Рецепт {number}',
+                text='Описание', cooking_time=10
+            )
+            for number in range(RECIPES)
+        ])
+        RecipeTag.objects.bulk_create([
+            RecipeTag(recipes=recipe, tags=tags[(number + shift) % 10])
+            for number, recipe in enumerate(recipes) for shift in range(3)
+        ])
+        Amount.objects.bulk_create([
+            Amount(
+                recipes=recipe, amount=shift + 1,
+                ingredients=ingredients[(number + shift) % 100]
+            )
+            for number, recipe in enumerate(recipes) for shift in range(8)
+        ])
+        pairs = [
+            (user, recipes[(number * 7 + shift) % RECIPES])
+            for number, user in enumerate(users) for shift in range(PER_USER)
+        ]
+        Favorite.objects.bulk_create([
+            Favorite(user=user, recipes=recipe) for user, recipe in pairs
+        ])
+        ShoppingCart.objects.bulk_create([
+            ShoppingCart(user=user, recipe=recipe) for user, recipe in pairs
+        ])
+        Subscriber.objects.bulk_create([
+            Subscriber(user=user, subscribed=users[(number + shift) % USERS])
+            for number, user in enumerate(users) for shift in range(1, 10)
+        ])
+        # Как после autovacuum: статистика и карта видимости, без которой
+        # чтение только индекса не дешевле обычного.
+        with connection.cursor() as cursor:
+            for model in (Amount, Favorite, RecipeTag, ShoppingCart,
+                          Subscriber):
+                cursor.execute(f'VACUUM ANALYZE {model._meta.db_table}')
+        self.user, self.author = users[1], users[2]
+        self.recipe, self.tag = recipes[3], tags[4]
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f'"{index}"' if ' ' in index else index, plan)
+
+    def test_favorites_of_user(self):
+        self.assertUsesIndex(
+            Favorite.objects.filter(user=self.user).order_by().values_list(
+                'recipes_id', flat=True
+            ),
+            'favorite_user_recipe_idx'
+        )
+
+    def test_shopping_cart_of_user(self):
+        self.assertUsesIndex(
+            ShoppingCart.objects.filter(user=self.user).order_by().values_list(
+                'recipe_id', flat=True
+            ),
+            'cart_user_recipe_idx'
+        )
+
+    def test_subscription_exists(self):
+        self.assertUsesIndex(
+            Subscriber.objects.filter(
+                user=self.user, subscribed=self.author
+            ).order_by().values_list('subscribed_id')[:1],
+            'unique subscriber'
+        )
+
+    def test_subscribed_annotation(self):
+        self.assertUsesIndex(
+            Recipe.objects.filter(pk=self.recipe.pk).annotate(
+                author_is_subscribed=Exists(Subscriber.objects.filter(
+                    user=self.user, subscribed=OuterRef('author')
+                ))
+            ),
+            'unique subscriber'
+        )
+
+    def test_recipe_ingredients(self):
+        self.assertUsesIndex(
+            Amount.objects.filter(recipes=self.recipe).order_by().values_list(
+                'ingredients_id', 'amount'
+            ),
+            'amount_recipe_ingredient_idx'
+        )
+
+    def test_recipes_with_tag(self):
+        self.assertUsesIndex(
+            RecipeTag.objects.filter(tags=self.tag).order_by().values_list(
+                'recipes_id', flat=True
+            ),
+            'recipe_tag_tag_recipe_idx'
+        )
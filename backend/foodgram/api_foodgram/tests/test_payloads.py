@@ -0,0 +1,119 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_foodgram.models import (
+    Favorite, Ingredient, Recipe, ShoppingCart, Subscriber, Tag
+)
+from api_foodgram.payloads import (
+    get_ingredient_payloads, get_recipe_payloads, get_tag_payloads
+)
+from api_foodgram.serializers import (
+    IngredientSerializerGet, RecipeSerializerGet, TagSerializer
+)
+from api_foodgram.tests.utils import (
+    create_ingredient, create_recipe, create_tag, create_user, get_client
+)
+
+VARIANTS = {
+    'card': {'webp': 'recipes/variants/card.webp'},
+    'thumbnail': {'jpeg': 'recipes/variants/thumbnail.jpeg'},
+}
+
+
+def as_json(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+class PayloadsTest(TestCase):
+    """Ответы из payloads совпадают с ответами сериализаторов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user(1)
+        cls.user = create_user(2)
+        tags = [create_tag('breakfast', 'Завтрак'), create_tag('lunch')]
+        salt = create_ingredient('соль')
+        sugar = create_ingredient('сахар', 'ч. л.')
+        cls.full = create_recipe(
+            cls.author, 'Полный', tags, [(salt, 5), (sugar, 10)]
+        )
+        Recipe.objects.filter(pk=cls.full.pk).update(
+            image='recipes/ab/cd/full.png', image_variants=VARIANTS
+        )
+        cls.no_tags = create_recipe(cls.author, 'Без тегов', (), [(salt, 1)])
+        cls.no_ingredients = create_recipe(
+            cls.author, 'Без ингредиентов', tags[:1]
+        )
+        cls.recipes = [cls.full, cls.no_tags, cls.no_ingredients]
+        Favorite.objects.create(user=cls.user, recipes=cls.full)
+        ShoppingCart.objects.create(user=cls.user, recipe=cls.no_tags)
+        Subscriber.objects.create(user=cls.user, subscribed=cls.author)
+
+    def get_request(self, user):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        return request
+
+    def serialize(self, recipe_id, user):
+        return as_json(RecipeSerializerGet(
+            Recipe.objects.get(pk=recipe_id),
+            context={'request': self.get_request(user)}
+        ).data)
+
+    def test_recipe_payloads(self):
+        request = self.get_request(AnonymousUser())
+        payloads = get_recipe_payloads(
+            [recipe.pk for recipe in self.recipes], request
+        )
+        for recipe in self.recipes:
+            expected = self.serialize(recipe.pk, AnonymousUser())
+            del expected['is_favorited'], expected['is_in_shopping_cart']
+            del expected['author']['is_subscribed']
+            with self.subTest(recipe=recipe.name):
+                self.assertEqual(as_json(payloads[recipe.pk]), expected)
+
+    def test_recipe_responses(self):
+        for user in (AnonymousUser(), self.user):
+            client = get_client(None if user.is_anonymous else user)
+            for recipe in self.recipes:
+                with self.subTest(recipe=recipe.name, user=str(user)):
+                    response = client.get(f'/api/recipes/{recipe.pk}/')
+                    self.assertEqual(
+                        response.json(), self.serialize(recipe.pk, user)
+                    )
+            with self.subTest(user=str(user)):
+                response = client.get('/api/recipes/')
+                self.assertEqual(response.json()['results'], [
+                    self.serialize(recipe.pk, user)
+                    for recipe in reversed(self.recipes)
+                ])
+
+    def test_tag_payloads(self):
+        queryset = Tag.objects.all()
+        self.assertEqual(
+            get_tag_payloads(queryset),
+            as_json(TagSerializer(queryset, many=True).data)
+        )
+
+    def test_ingredient_payloads(self):
+        queryset = Ingredient.objects.all()
+        self.assertEqual(
+            get_ingredient_payloads(queryset),
+            as_json(IngredientSerializerGet(queryset, many=True).data)
+        )
+
+    def test_retrieve_non_numeric_pk(self):
+        client = get_client(self.user)
+        for url in (
+            '/api/tags/abc/', '/api/ingredients/abc/', '/api/recipes/abc/'
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 404)
+        self.assertEqual(
+            client.post('/api/recipes/abc/favorite/').status_code, 404
+        )
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from api_foodgram.filters import tag_ids
+from api_foodgram.models import Favorite, ShoppingCart, Subscriber
+from api_foodgram.recipe_cache import recipe_cache
+from api_foodgram.tests.utils import (
+    create_ingredient, create_recipe, create_tag, create_user, get_client
+)
+
+RECIPES = 6
+# count(), страница, теги, состав и авторы рецептов страницы.
+COLD_LIST_QUERIES = 5
+# count() и страница: общая часть рецептов берется из recipe_cache.
+WARM_LIST_QUERIES = 2
+
+
+class RecipeListQueriesTest(TestCase):
+    """Число запросов страницы рецептов не зависит от ее размера."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user(1)
+        cls.reader = create_user(2)
+        tag = create_tag('breakfast')
+        salt = create_ingredient('соль')
+        cls.recipes = [
+            create_recipe(
+                cls.author, f'Рецепт {number}', tags=[tag],
+                amounts=[(salt, number + 1)]
+            )
+            for number in range(RECIPES)
+        ]
+        Subscriber.objects.create(user=cls.reader, subscribed=cls.author)
+        Favorite.objects.create(user=cls.reader, recipes=cls.recipes[-1])
+        ShoppingCart.objects.create(user=cls.reader, recipe=cls.recipes[-1])
+
+    def setUp(self):
+        # Версии в кэше не меняются при откате данных других тестов.
+        cache.clear()
+        tag_ids.get()
+
+    def get_clients(self):
+        reader = get_client(self.reader)
+        # Токен попадает в кэш аутентификации до замеров.
+        reader.get('/api/users/me/')
+        return {'anonymous': get_client(), 'reader': reader}
+
+    def test_cold_and_warm_pages(self):
+        for name, client in self.get_clients().items():
+            for limit in (1, RECIPES):
+                recipe_cache.entries.clear()
+                url = f'/api/recipes/?limit={limit}'
+                with self.subTest(name, limit=limit):
+                    with self.assertNumQueries(COLD_LIST_QUERIES):
+                        response = client.get(url)
+                    self.assertEqual(len(response.data['results']), limit)
+                    with self.assertNumQueries(WARM_LIST_QUERIES):
+                        self.assertEqual(client.get(url).data, response.data)
+
+    def test_user_flags(self):
+        clients = self.get_clients()
+        first = clients['reader'].get('/api/recipes/?limit=1').data
+        recipe = first['results'][0]
+        self.assertTrue(recipe['is_favorited'])
+        self.assertTrue(recipe['is_in_shopping_cart'])
+        self.assertTrue(recipe['author']['is_subscribed'])
+        # Общая часть из кэша не переносит флаги другому пользователю.
+        with self.assertNumQueries(WARM_LIST_QUERIES):
+            recipe = clients['anonymous'].get(
+                '/api/recipes/?limit=1'
+            ).data['results'][0]
+        self.assertFalse(recipe['is_favorited'])
+        self.assertFalse(recipe['is_in_shopping_cart'])
+        self.assertFalse(recipe['author']['is_subscribed'])
+
+
+class UserListQueriesTest(TestCase):
+    """Подписки текущего пользователя загружаются одним запросом."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = create_user(0)
+        cls.authors = [create_user(number) for number in range(1, 6)]
+        for author in cls.authors[::2]:
+            Subscriber.objects.create(user=cls.reader, subscribed=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages(self):
+        reader = get_client(self.reader)
+        reader.get('/api/users/me/')
+        # count() и страница, для пользователя - еще его подписки.
+        for client, queries in ((get_client(), 2), (reader, 3)):
+            for limit in (1, len(self.authors) + 1):
+                with self.subTest(queries=queries, limit=limit):
+                    with self.assertNumQueries(queries):
+                        response = client.get(f'/api/users/?limit={limit}')
+                    self.assertEqual(len(response.data['results']), limit)
+
+    def test_is_subscribed(self):
+        response = get_client(self.reader).get('/api/users/?limit=10')
+        subscribed = {
+            user['id'] for user in response.data['results']
+            if user['is_subscribed']
+        }
+        self.assertEqual(
+            subscribed, {author.pk for author in self.authors[::2]}
+        )
@@ -0,0 +1,51 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.timezone import utc
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api_foodgram.parsers import ORJSONParser
+from api_foodgram.renderers import ORJSONRenderer, orjson
+
+DATA = {
+    'decimal': Decimal('12.50'),
+    'datetime': datetime.datetime(2023, 1, 2, 3, 4, 5, 678901, tzinfo=utc),
+    'naive_datetime': datetime.datetime(2023, 1, 2, 3, 4, 5),
+    'date': datetime.date(2023, 1, 2),
+    'time': datetime.time(3, 4, 5, 600),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'name': 'Сырники с изюмом 🍓',
+    'separators': 'строка\u2028абзац\u2029',
+    'lazy': gettext_lazy('Рецепт'),
+    'numbers': [1, -2, 0.5, 10 ** 12, True, None],
+    'nested': {'ингредиенты': [{'id': 1, 'amount': Decimal('0.3')}]},
+}
+
+
+@skipIf(orjson is None, 'orjson не установлен.')
+class ORJSONTest(SimpleTestCase):
+
+    def test_render_matches_stock_renderer(self):
+        content = ORJSONRenderer().render(DATA)
+        self.assertEqual(content, JSONRenderer().render(DATA))
+        self.assertNotIn('\u2028'.encode(), content)
+
+    def test_round_trip(self):
+        content = ORJSONRenderer().render(DATA)
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(content)),
+            JSONParser().parse(BytesIO(content))
+        )
+        parsed = ORJSONParser().parse(BytesIO(content))
+        # JSONEncoder DRF отдает Decimal числом.
+        self.assertEqual(parsed['decimal'], 12.5)
+        self.assertEqual(parsed['datetime'], '2023-01-02T03:04:05.678901Z')
+        self.assertEqual(parsed['name'], DATA['name'])
+        self.assertEqual(parsed['separators'], DATA['separators'])
+        self.assertEqual(parsed['lazy'], 'Рецепт')
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import AsyncClient, override_settings, SimpleTestCase
+from django.test.client import RequestFactory
+from django.urls import path
+
+from api_foodgram.routers import read_from_replica, ReplicaMiddleware
+
+DELAY = 0.3
+CONCURRENCY = 6
+
+
+class ReplicaView:
+    read_replica = True
+
+
+def record_view(request):
+    return HttpResponse(str(read_from_replica.get()))
+
+
+async def slow_view(request):
+    await asyncio.sleep(DELAY)
+    return HttpResponse(str(read_from_replica.get()))
+
+
+record_view.cls = slow_view.cls = ReplicaView
+urlpatterns = [
+    path('record/', record_view),
+    path('slow/', slow_view),
+]
+
+
+@override_settings(
+    DATABASE_REPLICAS=['default'], ROOT_URLCONF=__name__,
+    MIDDLEWARE=['api_foodgram.routers.ReplicaMiddleware']
+)
+class ReplicaMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def reads_replica(self, **headers):
+        return self.client.get('/record/', **headers).content == b'True'
+
+    def write(self, status=201, **headers):
+        middleware = ReplicaMiddleware(lambda request: HttpResponse(
+            status=status
+        ))
+        middleware(self.factory.post('/record/', **headers))
+
+    def test_client_with_token_sticks_after_write(self):
+        token = {'HTTP_AUTHORIZATION': 'Token 1'}
+        self.assertTrue(self.reads_replica(**token))
+        self.write(**token)
+        self.assertFalse(self.reads_replica(**token))
+        self.assertTrue(
+            self.reads_replica(HTTP_AUTHORIZATION='Token 2')
+        )
+
+    def test_failed_write_does_not_stick(self):
+        token = {'HTTP_AUTHORIZATION': 'Token 1'}
+        self.write(status=400, **token)
+        self.assertTrue(self.reads_replica(**token))
+
+    def test_anonymous_client_is_not_sticky(self):
+        self.write(REMOTE_ADDR='10.0.0.1')
+        self.assertTrue(self.reads_replica(REMOTE_ADDR='10.0.0.1'))
+
+    def test_async_requests_run_concurrently(self):
+        async def get_all():
+            client = AsyncClient()
+            return await asyncio.gather(*(
+                client.get('/slow/') for _ in range(CONCURRENCY)
+            ))
+
+        start = time.perf_counter()
+        responses = asyncio.run(get_all())
+        elapsed = time.perf_counter() - start
+        self.assertEqual(
+            [response.content for response in responses],
+            [b'True'] * CONCURRENCY
+        )
+        self.assertLess(elapsed, DELAY * CONCURRENCY / 2)
@@ -0,0 +1,73 @@
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from api_foodgram.models import Recipe
+from api_foodgram.search import search_recipes, update_search_index
+from api_foodgram.tests.utils import (
+    create_ingredient, create_recipe, create_user, get_client
+)
+
+
+class SearchRecipesTest(TestCase):
+    """Поиск по названию, ингредиентам и описанию рецептов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user(1)
+        buckwheat = create_ingredient('гречка')
+        cls.in_text = create_recipe(author, 'Котлеты')
+        Recipe.objects.filter(pk=cls.in_text.pk).update(
+            text='Гарнир: гречка и соус'
+        )
+        cls.in_ingredients = create_recipe(
+            author, 'Каша', amounts=[(buckwheat, 100)]
+        )
+        cls.in_name = create_recipe(author, 'Гречка с грибами')
+        cls.other = create_recipe(author, 'Омлет')
+        # Индекс обновляется после фиксации, а тест ее не дожидается.
+        update_search_index()
+
+    def search(self, query):
+        return list(search_recipes(
+            Recipe.objects.all(), query
+        ).values_list('pk', flat=True))
+
+    def test_ranking(self):
+        self.assertEqual(
+            self.search('гречка'),
+            [self.in_name.pk, self.in_ingredients.pk, self.in_text.pk]
+        )
+
+    def test_all_words_required(self):
+        self.assertEqual(self.search('гречка грибами'), [self.in_name.pk])
+
+    def test_no_words(self):
+        self.assertEqual(self.search('!?'), [])
+
+    def test_empty_query_returns_all(self):
+        cache.clear()
+        response = get_client().get(
+            '/api/recipes/', {'search': '  ', 'limit': 10}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 4)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Префиксы только в FTS5.')
+    def test_prefix(self):
+        # В FTS5 нет стеммера: слова запроса ищутся как префиксы.
+        self.assertEqual(self.search('греч'), [
+            self.in_name.pk, self.in_ingredients.pk, self.in_text.pk
+        ])
+        self.assertEqual(self.search('гриб омл'), [])
+        self.assertEqual(self.search('омл'), [self.other.pk])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Отдельный индекс FTS5.')
+    def test_deleted_recipe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_name.delete()
+        self.assertEqual(
+            self.search('гречка'), [self.in_ingredients.pk, self.in_text.pk]
+        )
@@ -0,0 +1,125 @@
+from django.test import TestCase
+
+from api_foodgram.models import Amount, ShoppingCart, ShoppingListItem
+from api_foodgram.shopping_list import calculate_totals
+
+from .utils import create_ingredient, create_recipe, create_user, get_client
+
+
+class ShoppingListUpkeepTest(TestCase):
+    """Список покупок следует за корзиной при любом способе удаления."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user(1)
+        cls.buyer = create_user(2)
+        cls.other_buyer = create_user(3)
+        cls.salt = create_ingredient('соль')
+        cls.flour = create_ingredient('мука')
+        cls.soup = create_recipe(
+            cls.author, 'Суп', amounts=[(cls.salt, 5), (cls.flour, 100)]
+        )
+        cls.bread = create_recipe(
+            cls.author, 'Хлеб', amounts=[(cls.flour, 500)]
+        )
+
+    def setUp(self):
+        for user in (self.buyer, self.other_buyer):
+            for recipe in (self.soup, self.bread):
+                ShoppingCart.objects.create(user=user, recipe=recipe)
+
+    def get_items(self, user):
+        return dict(ShoppingListItem.objects.filter(user=user).values_list(
+            'ingredient_id', 'total'
+        ))
+
+    def assertMatchesCart(self):
+        totals = calculate_totals()
+        for user in (self.buyer, self.other_buyer):
+            self.assertEqual(self.get_items(user), totals.get(user.pk, {}))
+
+    def test_cart_rows_update_totals(self):
+        self.assertEqual(
+            self.get_items(self.buyer),
+            {self.salt.pk: 5, self.flour.pk: 600}
+        )
+        ShoppingCart.objects.filter(
+            user=self.buyer, recipe=self.bread
+        ).delete()
+        self.assertEqual(
+            self.get_items(self.buyer), {self.salt.pk: 5, self.flour.pk: 100}
+        )
+        self.assertMatchesCart()
+
+    def test_recipe_deleted_outside_api(self):
+        self.soup.delete()
+        self.assertEqual(self.get_items(self.buyer), {self.flour.pk: 500})
+        self.assertMatchesCart()
+
+    def test_recipe_deleted_through_api(self):
+        response = get_client(self.author).delete(
+            f'/api/recipes/{self.bread.pk}/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            self.get_items(self.other_buyer),
+            {self.salt.pk: 5, self.flour.pk: 100}
+        )
+        self.assertMatchesCart()
+
+    def test_user_deleted(self):
+        self.buyer.delete()
+        self.assertFalse(
+            ShoppingListItem.objects.filter(user_id=self.buyer.pk).exists()
+        )
+        self.assertMatchesCart()
+
+    def test_cart_through_api(self):
+        client = get_client(self.author)
+        url = f'/api/recipes/{self.soup.pk}/shopping_cart/'
+        self.assertEqual(client.post(url).status_code, 201)
+        self.assertEqual(
+            self.get_items(self.author), {self.salt.pk: 5, self.flour.pk: 100}
+        )
+        self.assertEqual(client.delete(url).status_code, 204)
+        self.assertEqual(self.get_items(self.author), {})
+        self.assertTrue(Amount.objects.filter(recipes=self.soup).exists())
+
+    def test_amount_changed_outside_api(self):
+        amount = Amount.objects.get(recipes=self.soup, ingredients=self.salt)
+        amount.amount = 7
+        amount.save()
+        self.assertEqual(
+            self.get_items(self.buyer), {self.salt.pk: 7, self.flour.pk: 600}
+        )
+        amount.ingredients = self.flour
+        amount.save()
+        self.assertEqual(self.get_items(self.buyer), {self.flour.pk: 607})
+        self.assertMatchesCart()
+
+    def test_amount_added_and_deleted_outside_api(self):
+        pepper = create_ingredient('перец')
+        Amount.objects.create(recipes=self.bread, ingredients=pepper, amount=2)
+        self.assertEqual(self.get_items(self.other_buyer)[pepper.pk], 2)
+        self.assertMatchesCart()
+        Amount.objects.filter(recipes=self.soup).delete()
+        self.assertEqual(
+            self.get_items(self.buyer), {self.flour.pk: 500, pepper.pk: 2}
+        )
+        self.assertMatchesCart()
+
+    def test_ingredients_changed_through_api(self):
+        pepper = create_ingredient('перец')
+        response = get_client(self.author).patch(
+            f'/api/recipes/{self.soup.pk}/',
+            {'ingredients': [
+                {'id': self.flour.pk, 'amount': 200},
+                {'id': pepper.pk, 'amount': 3},
+            ]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_items(self.buyer), {self.flour.pk: 700, pepper.pk: 3}
+        )
+        self.assertMatchesCart()
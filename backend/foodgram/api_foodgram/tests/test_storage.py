@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+import threading
+from unittest import skipUnless
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+from django.test import override_settings, TestCase, TransactionTestCase
+
+from api_foodgram.images import (
+    delete_unused_image, get_variant_names, image_storage
+)
+from api_foodgram.tests.utils import create_recipe, create_user, make_image
+
+
+@skipUnless(
+    connection.vendor == 'postgresql', 'Блокировка только в PostgreSQL.'
+)
+class ImageDeduplicationRaceTest(TransactionTestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.content = make_image('PNG')
+
+    def delete_in_thread(self, name):
+        def delete():
+            try:
+                delete_unused_image(name)
+            finally:
+                close_old_connections()
+        thread = threading.Thread(target=delete)
+        thread.start()
+        return thread
+
+    def test_delete_waits_for_recipe_reusing_file(self):
+        name = image_storage.save('a.png', ContentFile(self.content))
+        with transaction.atomic():
+            # Тот же файл загружают для нового рецепта: _save видит,
+            # что он уже есть, и не записывает его заново.
+            self.assertEqual(
+                image_storage.save('b.png', ContentFile(self.content)), name
+            )
+            thread = self.delete_in_thread(name)
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+            create_recipe(create_user(1), image=name)
+        thread.join()
+        self.assertTrue(image_storage.exists(name))
+
+    def test_unused_file_is_deleted(self):
+        name = image_storage.save('a.png', ContentFile(self.content))
+        self.delete_in_thread(name).join()
+        self.assertFalse(image_storage.exists(name))
+
+
+@override_settings(IMAGE_WORKERS=0)
+class ImageVariantsTest(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_cleared_image_resets_variants(self):
+        name = image_storage.save('a.png', ContentFile(make_image('PNG')))
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = create_recipe(create_user(1), image=name)
+        recipe.refresh_from_db()
+        variants = get_variant_names(name)
+        self.assertEqual(recipe.image_variants, variants)
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.image = None
+            recipe.save()
+        self.assertEqual(recipe.image_variants, {})
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.image_variants, {})
+        self.assertFalse(image_storage.exists(name))
+        self.assertFalse(
+            default_storage.exists(variants['card']['webp'])
+        )
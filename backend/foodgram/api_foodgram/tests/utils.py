@@ -0,0 +1,60 @@
+import os
+from io import BytesIO
+
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api_foodgram.models import Amount, Ingredient, Recipe, Tag, User
+
+
+def create_user(number):
+    return User.objects.create_user(
+        email=f'user{number}@foodgram.ru', username=f'user{number}',
+        first_name='Имя', last_name='Фамилия', password='Passw0rd!!'
+    )
+
+
+def create_tag(slug, name=None):
+    return Tag.objects.create(
+        name=name or slug, color='#E26C2D', slug=slug
+    )
+
+
+def create_ingredient(name, measurement_unit='г'):
+    return Ingredient.objects.create(
+        name=name, measurement_unit=measurement_unit
+    )
+
+
+def create_recipe(author, name='Рецепт', tags=(), amounts=(), image=None):
+    """Рецепт с тегами tags и составом amounts: [(ингредиент, кол-во)]."""
+    recipe = Recipe.objects.create(
+        author=author, name=name, text='Описание', cooking_time=10,
+        image=image
+    )
+    recipe.tags.set(tags)
+    Amount.objects.bulk_create([
+        Amount(recipes=recipe, ingredients=ingredient, amount=amount)
+        for ingredient, amount in amounts
+    ])
+    return recipe
+
+
+def get_client(user=None):
+    client = APIClient()
+    if user is not None:
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def make_image(image_format, size=(8, 8), noise=False):
+    """Картинка size в формате image_format, белая или из шума."""
+    if noise:
+        image = Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+    else:
+        image = Image.new('RGB', size, 'white')
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
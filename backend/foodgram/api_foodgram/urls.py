@@ -3,6 +3,7 @@ from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .async_views import get_async_urls
 from .views import (
     TagViewSet, RecipeViewSet, IngredientViewSet,
     UserViewSet
@@ -15,8 +16,12 @@ router.register('recipes', RecipeViewSet, basename='recipes')
 router.register('ingredients', IngredientViewSet, basename='ingredients')
 router.register('users', UserViewSet, basename='user')
 
+router_urls = router.urls
+if settings.ASYNC_READ_VIEWS:
+    router_urls = get_async_urls(router_urls)
+
 urlpatterns = [
-    path('', include(router.urls)),
+    path('', include(router_urls)),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
 ]
@@ -1,16 +1,47 @@
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Recipe
+
+
 def get_ingredients_list_for_shopping(ingredients):
-    shopping_list = {}
+    shopping_list = ['Список покупок \n\n']
     for ingredient in ingredients:
-        amount = ingredient.get('amount__sum')
-        name = ingredient.get('ingredients__name')
-        measurement_unit = ingredient.get(
-            'ingredients__measurement_unit'
+        shopping_list.append(
+            f"{ingredient['name']} "
+            f"({ingredient['measurement_unit']}) - "
+            f"{ingredient['total']}\n"
         )
-        shopping_list[name] = {
-            'measurement_unit': measurement_unit,
-            'amount': amount
-        }
-    main_list = ([f"{item}: {value['amount']}"
-                  f" {value['measurement_unit']}\n"
-                  for item, value in shopping_list.items()])
-    return main_list
+    return ''.join(shopping_list)
+
+
+def get_recipes_by_author(author_ids, recipes_limit=None):
+    """
+    Рецепты авторов одним запросом: {author_id: [recipe, ...]}.
+    При заданном recipes_limit для каждого автора берутся последние
+    recipes_limit рецептов через ROW_NUMBER() OVER (PARTITION BY author_id).
+    """
+    recipes_by_author = defaultdict(list)
+    if not author_ids:
+        return recipes_by_author
+    recipes = Recipe.objects.filter(author__in=author_ids).only(
+        'id', 'name', 'image', 'image_variants', 'cooking_time', 'author_id'
+    )
+    if recipes_limit is None:
+        recipes = recipes.order_by('author_id', '-id')
+    else:
+        sql, params = recipes.annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=F('id').desc()
+        )).order_by().query.sql_with_params()
+        recipes = Recipe.objects.raw(
+            f'SELECT * FROM ({sql}) AS ranked_recipes '
+            f'WHERE row_number <= %s ORDER BY author_id, id DESC',
+            (*params, recipes_limit)
+        )
+    for recipe in recipes:
+        recipes_by_author[recipe.author_id].append(recipe)
+    return recipes_by_author
@@ -0,0 +1,43 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'foodgram:version:{}'
+INGREDIENT_VERSION = 'ingredients'
+TAG_VERSION = 'tags'
+RECIPE_VERSION = 'recipe:{}'
+USER_VERSION = 'user:{}'
+AUTH_VERSION = 'auth:{}'
+
+
+def get_version(name):
+    """
+    Текущая метка версии данных name. Метка хранится в кэше Django,
+    поэтому при общем кэше все воркеры видят одну и ту же версию.
+    """
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(names):
+    """Метки версий сразу для нескольких имен: {name: version}."""
+    keys = {VERSION_KEY.format(name): name for name in names}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_version(name):
+    """Помечает данные name изменившимися после фиксации транзакции."""
+    transaction.on_commit(
+        lambda: cache.set(VERSION_KEY.format(name), uuid4().hex, None)
+    )
@@ -1,17 +1,23 @@
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Value
 from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .mixins import ListRetrieveViewSet
+from .mixins import CachedListMixin, ListRetrieveViewSet
 from .models import (
     User, Subscriber, Tag, Ingredient,
-    Recipe, Amount, ShoppingCart, Favorite
+    Recipe, ShoppingCart, Favorite, ShoppingListItem
 )
 from .filters import RecipeFilter, IngredientFilter
+from .importers import RecipeImporter
+from .ingredient_index import (
+    ingredient_index, search_similar_ingredients, SEARCH_LIMIT
+)
 from .serializers import (
     TagSerializer, RecipeWriteSerializer,
     RecipeSerializerGet, FavoriteRecipeSerializer,
@@ -22,17 +28,37 @@ from .serializers import (
     FollowListSerializer, FollowSerializer
 )
 from .pagination import FoodgramPagePagination
+from .payloads import (
+    get_ingredient_payloads, get_tag_payloads, INGREDIENT_FIELDS, TAG_FIELDS,
+    tag_payload
+)
+from .recipe_cache import recipe_cache, serialize_recipes
+from .utils import get_ingredients_list_for_shopping, get_recipes_by_author
+from .versions import INGREDIENT_VERSION, TAG_VERSION
 
 
 @permission_classes([permissions.AllowAny, ])
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet предназначен для взаимодействия в моделью Tag.
     Он позволяет получать данные о тэгах.
+    Список отдается из кэша воркера без обращения к БД.
     """
     queryset = Tag.objects.all().order_by('id')
     serializer_class = TagSerializer
     pagination_class = None
+    authentication_classes = ()
+    list_cache_version = TAG_VERSION
+    read_replica = True
+
+    def get_list_data(self, request, *args, **kwargs):
+        return get_tag_payloads(self.get_queryset())
+
+    def retrieve(self, request, *args, **kwargs):
+        tag = get_object_or_404(
+            self.get_queryset().values(*TAG_FIELDS), pk=kwargs['pk']
+        )
+        return Response(tag_payload(tag))
 
 
 @permission_classes([permissions.IsAuthenticatedOrReadOnly, ])
@@ -46,9 +72,40 @@ class RecipeViewSet(viewsets.ModelViewSet):
     """
     queryset = Recipe.objects.all()
     pagination_class = FoodgramPagePagination
+    read_replica = True
     filter_backends = (DjangoFilterBackend,)
     filter_class = RecipeFilter
 
+    def get_queryset(self):
+        if self.request.method != 'GET':
+            return Recipe.objects.all()
+        user = self.request.user
+        if user.is_anonymous:
+            return Recipe.objects.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+                author_is_subscribed=Value(False)
+            )
+        return Recipe.objects.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipes=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            author_is_subscribed=Exists(Subscriber.objects.filter(
+                user=user, subscribed=OuterRef('author')
+            ))
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serialize_recipes(page, request))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serialize_recipes([self.get_object()], request)[0])
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return RecipeSerializerGet
@@ -109,6 +166,37 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = LiteRecipeSerializer(recipe, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(
+        detail=False,
+        methods=['POST'],
+        url_path='import',
+        permission_classes=[IsAdminUser]
+    )
+    def import_recipes(self, request):
+        stream = request.stream
+        if stream is None:
+            return Response(
+                {'errors': 'Пустой запрос.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        importer = RecipeImporter(request.user).run(stream)
+        return Response({
+            'created': importer.created,
+            'errors': [
+                {'line': line_number, 'error': error}
+                for line_number, error in importer.errors
+            ]
+        })
+
+    @action(
+        detail=False,
+        methods=['GET'],
+        url_path='cache_stats',
+        permission_classes=[IsAdminUser]
+    )
+    def cache_stats(self, request):
+        return Response(recipe_cache.stats())
+
     @action(
         detail=False,
         methods=['GET'],
@@ -116,44 +204,59 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def download_shopping_cart(self, request):
-        ingredients = Amount.objects.filter(
-            recipes__shopping__user=request.user).values(
-            'ingredients__name',
-            'ingredients__measurement_unit',
-            'amount'
-        )
-        list_unique_ingr = []
-        shop_list = 'Список покупок \n\n'
-        for i in range(len(ingredients)):
-            if ingredients[i].get('ingredients__name') not in list_unique_ingr:
-                list_unique_ingr.append(
-                    ingredients[i].get('ingredients__name')
-                )
-        for unique_ingr in list_unique_ingr:
-            count = 0
-            ingredient = ingredients.filter(ingredients__name=unique_ingr)
-            for i in range(len(ingredient)):
-                count += ingredient[i].get('amount')
-            shop_list += (
-                f"{ingredient[i].get('ingredients__name')} "
-                f"({ingredient[i].get('ingredients__measurement_unit')}) - "
-                f"{count}\n")
+        ingredients = ShoppingListItem.objects.filter(
+            user=request.user
+        ).values(
+            'total',
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit')
+        ).order_by('name', 'measurement_unit')
+        shop_list = get_ingredients_list_for_shopping(ingredients)
         response = HttpResponse(shop_list, 'Content-Type: text/plain')
         response['Content-Disposition'] = 'attachment; filename="Cart.txt"'
         return response
 
 
 @permission_classes([permissions.AllowAny, ])
-class IngredientViewSet(ListRetrieveViewSet):
+class IngredientViewSet(CachedListMixin, ListRetrieveViewSet):
     """
     ViewSet предназначен для взаимодействия в моделью Ingredient.
     Он позволяет получать данные обо всех ингредиентах
     или о каком-то определнном.
+    Полный список отдается из кэша воркера без обращения к БД.
     """
     serializer_class = IngredientSerializerGet
     queryset = Ingredient.objects.all().order_by('name')
     filter_backends = (IngredientFilter,)
     search_fields = ('^name',)
+    authentication_classes = ()
+    list_cache_version = INGREDIENT_VERSION
+    read_replica = True
+
+    def get_list_data(self, request, *args, **kwargs):
+        return get_ingredient_payloads(self.get_queryset())
+
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get(IngredientFilter.search_param)
+        if not name:
+            return super().list(request, *args, **kwargs)
+        ingredients = ingredient_index.search(name)
+        if ingredients is None:
+            ingredients = get_ingredient_payloads(
+                self.filter_queryset(self.get_queryset()), SEARCH_LIMIT
+            )
+        if settings.INGREDIENT_FUZZY_SEARCH:
+            # После совпадений по началу названия - похожие названия.
+            ingredients += search_similar_ingredients(
+                name, [ingredient['id'] for ingredient in ingredients],
+                SEARCH_LIMIT - len(ingredients)
+            )
+        return Response(ingredients)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(get_object_or_404(
+            self.get_queryset().values(*INGREDIENT_FIELDS), pk=kwargs['pk']
+        ))
 
 
 @permission_classes([permissions.AllowAny, ])
@@ -167,6 +270,7 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     pagination_class = FoodgramPagePagination
+    read_replica = True
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -228,11 +332,18 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def subscriptions(self, request, pk=None):
         subscriptions_list = self.paginate_queryset(
-            User.objects.filter(subscribed__user=request.user)
+            User.objects.filter(
+                subscribed__user=request.user
+            ).annotate(is_subscribed=Value(True))
         )
+        recipes_limit = request.query_params.get('recipes_limit')
         serializer = FollowListSerializer(
             subscriptions_list, many=True, context={
-                'request': request
+                'request': request,
+                'recipes_by_author': get_recipes_by_author(
+                    [author.pk for author in subscriptions_list],
+                    int(recipes_limit) if recipes_limit else None
+                )
             }
         )
         return self.get_paginated_response(serializer.data)
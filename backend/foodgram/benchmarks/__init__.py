@@ -0,0 +1,30 @@
+"""
+Замеры производительности. Запускаются из backend/foodgram:
+python -m benchmarks.<модуль>. Нужна БД с примененными миграциями;
+данные замера создаются в транзакции и в конце откатываются.
+"""
+import os
+import timeit
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+django.setup()
+
+from django.db import transaction  # noqa: E402
+
+
+def measure(function, number, repeat=5):
+    """Лучшее из repeat время одного вызова function, в микросекундах."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) * (
+        1e6 / number
+    )
+
+
+@contextmanager
+def rollback():
+    """Транзакция, которая откатывается после замера."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
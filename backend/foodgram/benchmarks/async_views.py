@@ -0,0 +1,175 @@
+"""
+Запросы на чтение под нагрузкой: gunicorn с WSGI, uvicorn с обычными
+view (ASYNC_READ_VIEWS=False) и uvicorn с асинхронными view
+из get_async_urls (ASYNC_READ_VIEWS=True). На каждый вариант
+запускается один воркер, клиенты шлют запросы с concurrency
+одновременными соединениями.
+
+Разница видна, когда запросы ждут БД: --db-latency добавляет
+задержку на каждый пакет между сервером и PostgreSQL из DB_HOST
+и DB_PORT, как при БД на другой машине.
+
+python -m benchmarks.async_views [--db-latency 2] [--concurrency 1 16 64]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+
+HOST = '127.0.0.1'
+PORT = 8011
+PROXY_PORT = 5499
+PATHS = (
+    '/api/recipes/?limit=6', '/api/tags/', '/api/ingredients/?name=абр',
+)
+SERVERS = {
+    'gunicorn, WSGI': ('foodgram.wsgi:application', None, {}),
+    'uvicorn, синхронные view': (
+        'foodgram.asgi:application', 'uvicorn.workers.UvicornWorker',
+        {'ASYNC_READ_VIEWS': 'False'}
+    ),
+    'uvicorn, асинхронные view': (
+        'foodgram.asgi:application', 'uvicorn.workers.UvicornWorker',
+        {'ASYNC_READ_VIEWS': 'True'}
+    ),
+}
+
+
+async def pipe(reader, writer, delay):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+def start_db_proxy(delay):
+    """TCP-прокси к БД с задержкой delay секунд на каждый пакет."""
+    database = settings.DATABASES['default']
+
+    async def handle(client_reader, client_writer):
+        if database['HOST'].startswith('/'):
+            server_reader, server_writer = await asyncio.open_unix_connection(
+                os.path.join(database['HOST'], f'.s.PGSQL.{database["PORT"]}')
+            )
+        else:
+            server_reader, server_writer = await asyncio.open_connection(
+                database['HOST'], database['PORT']
+            )
+        await asyncio.gather(
+            pipe(client_reader, server_writer, delay),
+            pipe(server_reader, client_writer, delay),
+        )
+
+    async def serve():
+        server = await asyncio.start_server(handle, HOST, PROXY_PORT)
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(
+        target=asyncio.run, args=(serve(),), daemon=True
+    ).start()
+
+
+def start_server(application, worker_class, environment):
+    command = [
+        sys.executable, '-m', 'gunicorn', application,
+        '--bind', f'{HOST}:{PORT}', '--workers', '1',
+    ]
+    if worker_class:
+        command += ['--worker-class', worker_class]
+    server = subprocess.Popen(
+        command, env=dict(os.environ, **environment),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection((HOST, PORT)).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('Сервер не запустился.')
+
+
+async def get(path):
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(
+        f'GET {quote(path, safe="/?=&")} HTTP/1.1\r\n'
+        f'Host: localhost\r\nConnection: close\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    if not response.startswith(b'HTTP/1.1 200'):
+        raise RuntimeError(response[:200])
+    return time.perf_counter() - start
+
+
+async def load(concurrency, requests):
+    """Запросов в секунду, медиана и 99-й перцентиль задержки в мс."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request(number):
+        async with semaphore:
+            latencies.append(await get(PATHS[number % len(PATHS)]))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(number) for number in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        requests / elapsed, latencies[len(latencies) // 2] * 1e3,
+        latencies[int(len(latencies) * 0.99)] * 1e3
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db-latency', type=float, default=0, help='мс')
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 16, 64]
+    )
+    parser.add_argument('--requests', type=int, default=400)
+    args = parser.parse_args()
+    environment = {'IMAGE_WORKERS': '0', 'DEBUG': 'False'}
+    if args.db_latency:
+        start_db_proxy(args.db_latency / 1e3)
+        environment.update(DB_HOST=HOST, DB_PORT=str(PROXY_PORT))
+    for name, (application, worker_class, extra) in SERVERS.items():
+        server = start_server(
+            application, worker_class, dict(environment, **extra)
+        )
+        try:
+            asyncio.run(load(1, len(PATHS)))
+            for concurrency in args.concurrency:
+                rps, median, p99 = asyncio.run(
+                    load(concurrency, args.requests)
+                )
+                print(
+                    f'{name:<26} c={concurrency:<3} {rps:6.0f} rps, '
+                    f'p50 {median:6.1f} мс, p99 {p99:6.1f} мс'
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Поиск ингредиентов по началу названия и нечеткий поиск
+на ингредиентах из fixtures/ingredients.json (таблица ингредиентов
+на время замера заменяется ими).
+
+python -m benchmarks.ingredient_search [запрос ...]
+"""
+import argparse
+import time
+
+from api_foodgram.ingredient_index import (
+    has_trigram_extension, IngredientIndex, SEARCH_LIMIT,
+    search_similar_ingredients
+)
+from api_foodgram.management.commands.load_ingredients import (
+    clean_rows, DEFAULT_PATH, read_rows
+)
+from api_foodgram.models import Ingredient
+from benchmarks import measure, rollback
+
+QUERIES = ('абрикас', 'молоко', 'картофиль', 'рикос')
+
+
+def load_fixture():
+    Ingredient.objects.all().delete()
+    Ingredient.objects.bulk_create([
+        Ingredient(name=name, measurement_unit=measurement_unit)
+        for name, measurement_unit in dict.fromkeys(
+            clean_rows(read_rows(DEFAULT_PATH))
+        )
+    ])
+    return Ingredient.objects.count()
+
+
+def search(index, query):
+    """Как IngredientViewSet.list: сначала по началу, затем похожие."""
+    ingredients = index.search(query)
+    return ingredients + index.search_similar(
+        query, [ingredient['id'] for ingredient in ingredients],
+        SEARCH_LIMIT - len(ingredients)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('queries', nargs='*', default=QUERIES)
+    args = parser.parse_args()
+    with rollback():
+        print(f'Ингредиентов: {load_fixture()} ({DEFAULT_PATH})')
+        index = IngredientIndex()
+        start = time.perf_counter()
+        index.refresh()
+        build = (time.perf_counter() - start) * 1e3
+        print(f'построение индекса: {build:.1f} мс')
+        trigram = has_trigram_extension()
+        for query in args.queries:
+            found = len(search(index, query))
+            line = (
+                f'{query!r:<14} найдено {found:>3}, индекс воркера '
+                f'{measure(lambda: search(index, query), 100) / 1e3:.2f} мс'
+            )
+            if trigram:
+                pg_trgm = measure(
+                    lambda: search_similar_ingredients(query), 10
+                )
+                line += f', pg_trgm {pg_trgm / 1e3:.2f} мс'
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
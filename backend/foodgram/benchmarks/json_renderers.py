@@ -0,0 +1,81 @@
+"""
+ORJSONRenderer и ORJSONParser против стандартных JSONRenderer
+и JSONParser DRF на ответах в формате API. БД не нужна.
+
+python -m benchmarks.json_renderers
+"""
+from io import BytesIO
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api_foodgram.parsers import ORJSONParser
+from api_foodgram.renderers import ORJSONRenderer, orjson
+from benchmarks import measure
+
+
+def get_recipe(number):
+    return {
+        'id': number,
+        'tags': [
+            {'id': tag, 'name': 'Завтрак', 'color': '#E26C2D',
+             'slug': 'breakfast'}
+            for tag in range(3)
+        ],
+        'author': {
+            'email': 'user@foodgram.ru', 'id': 1, 'username': 'user',
+            'first_name': 'Имя', 'last_name': 'Фамилия',
+            'is_subscribed': False,
+        },
+        'image': f'http://localhost/media/recipes/{number:064x}.png',
+        'image_variants': {
+            'card': {'webp': f'http://localhost/media/{number}.webp'},
+        },
+        'name': f'Рецепт {number}',
+        'text': 'Смешать все ингредиенты и запекать 30 минут. ' * 10,
+        'cooking_time': 30,
+        'ingredients': [
+            {'id': str(ingredient), 'name': 'мука пшеничная',
+             'measurement_unit': 'г', 'amount': 200}
+            for ingredient in range(8)
+        ],
+        'is_favorited': False,
+        'is_in_shopping_cart': True,
+    }
+
+
+PAYLOADS = {
+    'страница рецептов': {
+        'count': 100, 'next': None, 'previous': None,
+        'results': [get_recipe(number) for number in range(6)],
+    },
+    'ингредиенты': [
+        {'id': number, 'name': f'ингредиент {number}',
+         'measurement_unit': 'г'}
+        for number in range(2000)
+    ],
+}
+
+
+def main():
+    if orjson is None:
+        print('orjson не установлен: ORJSONRenderer работает как JSONRenderer')
+    for name, data in PAYLOADS.items():
+        content = JSONRenderer().render(data)
+        assert ORJSONRenderer().render(data) == content
+        print(f'{name} ({len(content)} байт):')
+        for action, stock, fast in (
+            ('рендер', lambda: JSONRenderer().render(data),
+             lambda: ORJSONRenderer().render(data)),
+            ('парсинг', lambda: JSONParser().parse(BytesIO(content)),
+             lambda: ORJSONParser().parse(BytesIO(content))),
+        ):
+            stock, fast = measure(stock, 100), measure(fast, 100)
+            print(
+                f'  {action:<8} стандартный {stock:9.1f} мкс, '
+                f'orjson {fast:9.1f} мкс, x{stock / fast:.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Время на один объект: payloads против сериализаторов DRF.
+
+python -m benchmarks.payloads [--recipes 50] [--ingredients 500]
+"""
+import argparse
+
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_foodgram.models import Ingredient, Recipe, Tag
+from api_foodgram.payloads import (
+    get_ingredient_payloads, get_recipe_payloads, get_tag_payloads
+)
+from api_foodgram.serializers import (
+    IngredientSerializerGet, RecipeSerializerGet, TagSerializer
+)
+from api_foodgram.tests.utils import (
+    create_ingredient, create_recipe, create_tag, create_user
+)
+from benchmarks import measure, rollback
+
+TAGS_PER_RECIPE = 3
+INGREDIENTS_PER_RECIPE = 8
+
+
+def create_data(recipes, ingredients):
+    author = create_user('bench')
+    tags = [create_tag(f'bench{number}') for number in range(10)]
+    created = [
+        create_ingredient(f'ингредиент {number}')
+        for number in range(ingredients)
+    ]
+    return [
+        create_recipe(
+            author, f'Рецепт {number}',
+            tags[number % 8:number % 8 + TAGS_PER_RECIPE],
+            [
+                (created[(number + shift) % ingredients], shift + 1)
+                for shift in range(INGREDIENTS_PER_RECIPE)
+            ]
+        ).pk
+        for number in range(recipes)
+    ]
+
+
+def report(name, count, payloads, serializer):
+    payloads = measure(payloads, 10) / count
+    serializer = measure(serializer, 10) / count
+    print(
+        f'{name:<12} {count:>5} шт. payloads {payloads:8.1f} мкс, '
+        f'сериализатор {serializer:8.1f} мкс, x{serializer / payloads:.1f}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--recipes', type=int, default=50)
+    parser.add_argument('--ingredients', type=int, default=500)
+    args = parser.parse_args()
+    request = Request(APIRequestFactory().get('/api/recipes/'))
+    request.user = AnonymousUser()
+    with rollback():
+        recipe_ids = create_data(args.recipes, args.ingredients)
+        recipes = Recipe.objects.filter(pk__in=recipe_ids).select_related(
+            'author'
+        ).prefetch_related('tags', 'amount__ingredients')
+        report(
+            'рецепты', len(recipe_ids),
+            lambda: get_recipe_payloads(recipe_ids, request),
+            lambda: RecipeSerializerGet(
+                recipes.all(), many=True, context={'request': request}
+            ).data
+        )
+        tags = Tag.objects.all()
+        report(
+            'теги', tags.count(),
+            lambda: get_tag_payloads(tags.all()),
+            lambda: TagSerializer(tags.all(), many=True).data
+        )
+        ingredients = Ingredient.objects.all()
+        report(
+            'ингредиенты', ingredients.count(),
+            lambda: get_ingredient_payloads(ingredients.all()),
+            lambda: IngredientSerializerGet(ingredients.all(), many=True).data
+        )
+
+
+if __name__ == '__main__':
+    main()
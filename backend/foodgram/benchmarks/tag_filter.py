@@ -0,0 +1,93 @@
+"""
+Фильтр рецептов по тегам: TagSlugFilter (slug из карты воркера,
+EXISTS по RecipeTag) против прежнего AllValuesMultipleFilter
+(варианты - DISTINCT slug по всем рецептам на каждый запрос,
+фильтр - JOIN по тегам и DISTINCT). Замеряется страница
+из 6 рецептов и ее count(), как в списке рецептов.
+
+python -m benchmarks.tag_filter [--recipes 50000]
+"""
+import argparse
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+
+from api_foodgram.filters import tag_ids
+from api_foodgram.models import Recipe, RecipeTag, Tag
+from api_foodgram.tests.utils import create_tag, create_user
+from benchmarks import measure, rollback
+
+TAGS = 30
+TAGS_PER_RECIPE = 3
+PAGE_SIZE = 6
+
+
+def create_data(recipes):
+    author = create_user('bench')
+    tags = [create_tag(f'bench{number}') for number in range(TAGS)]
+    created = Recipe.objects.bulk_create([
+        Recipe(
+            author=author, name=f'Рецепт {number}', text='Описание',
+            cooking_time=10
+        )
+        for number in range(recipes)
+    ])
+    RecipeTag.objects.bulk_create([
+        RecipeTag(recipes=recipe, tags=tags[(number + shift) % TAGS])
+        for number, recipe in enumerate(created)
+        for shift in range(TAGS_PER_RECIPE)
+    ])
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for model in (Recipe, RecipeTag, Tag):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+    return [tag.slug for tag in tags]
+
+
+def get_page(queryset):
+    queryset.count()
+    return list(queryset.order_by('-id').values_list('id', flat=True)[
+        :PAGE_SIZE
+    ])
+
+
+def join_filter(slugs):
+    # Варианты AllValuesMultipleFilter.
+    set(Recipe.objects.distinct().order_by('tags__slug').values_list(
+        'tags__slug', flat=True
+    ))
+    return get_page(Recipe.objects.filter(tags__slug__in=slugs).distinct())
+
+
+def exists_filter(slugs):
+    ids = tag_ids.get()
+    return get_page(Recipe.objects.filter(Exists(RecipeTag.objects.filter(
+        recipes=OuterRef('pk'),
+        tags_id__in=[ids[slug] for slug in slugs if slug in ids]
+    ))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--recipes', type=int, default=50000)
+    args = parser.parse_args()
+    with rollback():
+        slugs = create_data(args.recipes)
+        # Карта строится из транзакции замера: версия тегов в ней
+        # не меняется до фиксации.
+        tag_ids.entry = (None, {})
+        tag_ids.get()
+        print(f'Рецептов: {Recipe.objects.count()}')
+        for count in (1, 3, TAGS):
+            selected = slugs[:count]
+            assert join_filter(selected) == exists_filter(selected)
+            join = measure(lambda: join_filter(selected), 10) / 1e3
+            exists = measure(lambda: exists_filter(selected), 10) / 1e3
+            print(
+                f'тегов {count:>2}: JOIN и DISTINCT {join:7.2f} мс, '
+                f'EXISTS {exists:7.2f} мс, x{join / exists:.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -35,6 +35,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api_foodgram.routers.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,6 +59,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
+ASGI_APPLICATION = 'foodgram.asgi.application'
+# Асинхронные view для запросов на чтение, включать при запуске под ASGI.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', default='False') == 'True'
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
@@ -69,6 +73,49 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2:5433.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(','))):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        HOST=host,
+        PORT=port or DATABASES['default']['PORT'],
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api_foodgram.routers.ReplicaRouter']
+if DATABASES['default']['ENGINE'] != 'django.db.backends.postgresql':
+    # INCLUDE в индексе Amount есть только в PostgreSQL, в других
+    # БД индекс создается без него.
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', default=10))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='foodgram'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=10000)),
+        },
+    }
+}
+
+RECIPE_CACHE_MAX_ENTRIES = int(os.getenv('RECIPE_CACHE_MAX_ENTRIES', default=2000))
+
+INGREDIENT_FUZZY_SEARCH = os.getenv('INGREDIENT_FUZZY_SEARCH', default='True') == 'True'
+
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', default=60))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', default=10000))
+TOKEN_CACHE_SHARED = os.getenv('TOKEN_CACHE_SHARED', default='False') == 'True'
+
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', default=2))
+MAX_IMAGE_SIZE = int(os.getenv('MAX_IMAGE_SIZE', default=10 * 1024 * 1024))
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 AUTH_USER_MODEL = 'api_foodgram.User'
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,12 +148,32 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Рендерер и парсер на orjson; без пакета orjson работают стандартные.
+USE_ORJSON = os.getenv('USE_ORJSON', default='True') == 'True'
+JSON_RENDERER = (
+    'api_foodgram.renderers.ORJSONRenderer' if USE_ORJSON
+    else 'rest_framework.renderers.JSONRenderer'
+)
+JSON_PARSER = (
+    'api_foodgram.parsers.ORJSONParser' if USE_ORJSON
+    else 'rest_framework.parsers.JSONParser'
+)
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        JSON_RENDERER,
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_PARSER,
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api_foodgram.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }